@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# Замеры горячих путей на синтетическом профиле. Результат — JSON-база (медиана/минимум в мс),
+# режим --compare сравнивает с сохранённой базой и завершается с кодом 1 при регрессии.
+#   python benchmarks/hot_paths.py --years 5 --output baseline.json
+#   python benchmarks/hot_paths.py --years 5 --compare baseline.json [--threshold 1.25]
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from salary_calendar import calculations, database, events, month_view, payroll
+from salary_calendar.holidays import load_manual_holidays
+from salary_calendar.ledger import PeriodLedger
+from salary_calendar.repository import ShiftRepository, load_month_data
+from salary_calendar.settings import DEFAULT_COLORS
+from synthetic import LUNCH_MIN, SALARY, generate_profile
+
+BENCHMARKS = []
+
+def benchmark(name, ops=1):
+    # ops — число операций в одном замере; в отчёт идёт время на один прогон
+    def register(fn):
+        BENCHMARKS.append((name, fn, ops))
+        return fn
+    return register
+
+class Context:
+    def __init__(self, db_path, start_year, years, seed):
+        self.db_path = db_path
+        self.start_year = start_year
+        self.years = years
+        self.rng = random.Random(seed)
+        self.conn = database.connect(db_path)
+        self.holidays_set, self.holidays_names = load_manual_holidays(range(start_year, start_year + years))
+        self.prod_cal = calculations.ProductionCalendar(self.holidays_set)
+        self.days = [r[0] for r in self.conn.execute("SELECT day FROM shifts ORDER BY day")]
+        self.months = sorted({(int(d[:4]), int(d[5:7])) for d in self.days})
+        self.scratch = tempfile.mkdtemp(prefix="bench-")
+
+    def random_month(self):
+        return self.rng.choice(self.months)
+
+    def fresh_copy(self):
+        # изменяющие замеры работают на копии БД, копирование в замер не входит
+        path = os.path.join(self.scratch, "copy.db")
+        shutil.copyfile(self.db_path, path)
+        return database.connect(path)
+
+    def close(self):
+        self.conn.close()
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+@benchmark("database.load_shift x100", ops=100)
+def bench_load_shift(ctx):
+    days = ctx.rng.sample(ctx.days, 100)
+    started = time.perf_counter()
+    for d in days:
+        database.load_shift(ctx.conn, d)
+    return time.perf_counter() - started
+
+@benchmark("database.list_shifts_between month")
+def bench_list_shifts_between(ctx):
+    y, m = ctx.random_month()
+    start, end = month_view.visible_range(y, m)
+    started = time.perf_counter()
+    database.list_shifts_between(ctx.conn, start, end)
+    return time.perf_counter() - started
+
+@benchmark("database.load_shifts_between year")
+def bench_load_shifts_between_year(ctx):
+    y = ctx.random_month()[0]
+    started = time.perf_counter()
+    database.load_shifts_between(ctx.conn, f"{y}-01-01", f"{y}-12-31")
+    return time.perf_counter() - started
+
+@benchmark("database.find_pending_overtimes month")
+def bench_find_pending_month(ctx):
+    y, m = ctx.random_month()
+    started = time.perf_counter()
+    database.find_pending_overtimes(ctx.conn, y, m)
+    return time.perf_counter() - started
+
+@benchmark("database.find_pending_overtimes all")
+def bench_find_pending_all(ctx):
+    started = time.perf_counter()
+    database.find_pending_overtimes(ctx.conn)
+    return time.perf_counter() - started
+
+@benchmark("events.distribute_overtime_minutes")
+def bench_distribute_overtime_minutes(ctx):
+    conn = ctx.fresh_copy()
+    try:
+        pending = database.find_pending_overtimes(conn)
+        source, minutes = ctx.rng.choice(pending)[:2] if pending else (ctx.days[0], 60)
+        y, m, half = int(source[:4]), int(source[5:7]), 1 if int(source[8:10]) <= 15 else 2
+        started = time.perf_counter()
+        events.distribute_overtime_minutes(conn, y, m, half, source, minutes or 0)
+        return time.perf_counter() - started
+    finally:
+        conn.close()
+
+@benchmark("events.distribute_pending_overtime all")
+def bench_distribute_pending(ctx):
+    conn = ctx.fresh_copy()
+    try:
+        started = time.perf_counter()
+        events.distribute_pending_overtime(conn)
+        return time.perf_counter() - started
+    finally:
+        conn.close()
+
+@benchmark("calculations.hourly_rate_for_month x12", ops=12)
+def bench_hourly_rate_for_month(ctx):
+    y = ctx.random_month()[0]
+    started = time.perf_counter()
+    for m in range(1, 13):
+        calculations.hourly_rate_for_month(y, m, ctx.holidays_set, SALARY)
+    return time.perf_counter() - started
+
+@benchmark("calculations.compute_shift x1000", ops=1000)
+def bench_compute_shift(ctx):
+    rate = calculations.hourly_rate_for_month(ctx.start_year, 3, ctx.holidays_set, SALARY)
+    durations = [ctx.rng.randint(300, 900) for _ in range(1000)]
+    started = time.perf_counter()
+    for i, dur in enumerate(durations):
+        calculations.compute_shift(dur, rate, 480 + LUNCH_MIN, LUNCH_MIN, i % 7 == 0)
+    return time.perf_counter() - started
+
+@benchmark("calculations.compute_shift_cents x1000", ops=1000)
+def bench_compute_shift_cents(ctx):
+    rate = ctx.prod_cal.hourly_rate_cents(ctx.start_year, 3, SALARY)
+    durations = [ctx.rng.randint(300, 900) for _ in range(1000)]
+    started = time.perf_counter()
+    for i, dur in enumerate(durations):
+        calculations.compute_shift_cents(dur, rate, 480 + LUNCH_MIN, LUNCH_MIN, i % 7 == 0)
+    return time.perf_counter() - started
+
+@benchmark("payroll.recompute_columns all")
+def bench_recompute_columns(ctx):
+    cols = payroll.load_shift_columns(ctx.conn, *database.period_bounds())
+    started = time.perf_counter()
+    payroll.recompute_columns(cols, ctx.prod_cal, SALARY, LUNCH_MIN)
+    return time.perf_counter() - started
+
+@benchmark("ledger.PeriodLedger.build")
+def bench_ledger_build(ctx):
+    started = time.perf_counter()
+    PeriodLedger.build(ctx.conn)
+    return time.perf_counter() - started
+
+def _draw_data(repo, ledger, ctx, y, m):
+    # то, что _load_month и _apply_month делают до обращения к Tk
+    shifts, weeks, _totals = load_month_data(repo, ledger, y, m)
+    month_view.build_month_view(y, m, date.today(), shifts, ctx.holidays_set, DEFAULT_COLORS, 480 + LUNCH_MIN, weeks.get)
+
+@benchmark("draw_calendar data, cold cache")
+def bench_draw_cold(ctx):
+    ledger = PeriodLedger.build(ctx.conn)
+    repo = ShiftRepository(ctx.conn, ledger=ledger)
+    y, m = ctx.random_month()
+    started = time.perf_counter()
+    _draw_data(repo, ledger, ctx, y, m)
+    return time.perf_counter() - started
+
+@benchmark("draw_calendar data, month navigation x12", ops=12)
+def bench_draw_navigation(ctx):
+    ledger = PeriodLedger.build(ctx.conn)
+    repo = ShiftRepository(ctx.conn, ledger=ledger)
+    i = ctx.rng.randrange(max(1, len(ctx.months) - 12))
+    months = ctx.months[i:i + 12]
+    started = time.perf_counter()
+    for y, m in months:
+        _draw_data(repo, ledger, ctx, y, m)
+    return time.perf_counter() - started
+
+@benchmark("year_view data")
+def bench_year_view(ctx):
+    y = ctx.random_month()[0]
+    started = time.perf_counter()
+    shifts = database.load_shifts_between(ctx.conn, f"{y}-01-01", f"{y}-12-31")
+    month_view.build_year_view(y, date.today(), shifts, ctx.holidays_set, DEFAULT_COLORS)
+    return time.perf_counter() - started
+
+def run(ctx, repeat, only=None):
+    results = {}
+    for name, fn, ops in BENCHMARKS:
+        if only and only not in name: continue
+        fn(ctx)  # прогрев
+        samples = [fn(ctx) * 1000 for _ in range(repeat)]
+        results[name] = {"median_ms": round(statistics.median(samples), 4), "min_ms": round(min(samples), 4),
+                         "per_op_us": round(statistics.median(samples) * 1000 / ops, 3), "repeat": repeat}
+    return results
+
+def compare(results, baseline, threshold):
+    # [(имя, было, стало, отношение)] для замеров, медиана которых выросла больше чем в threshold раз
+    regressions = []
+    for name, current in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old or not old["median_ms"]: continue
+        ratio = current["median_ms"] / old["median_ms"]
+        current["baseline_ms"] = old["median_ms"]
+        current["ratio"] = round(ratio, 3)
+        if ratio > threshold:
+            regressions.append((name, old["median_ms"], current["median_ms"], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки горячих путей на синтетическом профиле")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--start-year", type=int, default=2024)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--only", help="подстрока имени замера")
+    parser.add_argument("--db", help="готовая БД профиля вместо синтетической")
+    parser.add_argument("--output", help="записать результат как базу")
+    parser.add_argument("--compare", help="сравнить с базой")
+    parser.add_argument("--threshold", type=float, default=1.25, help="допустимое замедление медианы")
+    args = parser.parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="bench-profile-")
+    try:
+        db_path = args.db
+        if not db_path:
+            db_path = os.path.join(workdir, "synthetic.db")
+            generate_profile(db_path, args.years, args.start_year, args.seed)
+        ctx = Context(db_path, args.start_year, args.years, args.seed)
+        try:
+            results = run(ctx, args.repeat, args.only)
+            shifts = len(ctx.days)
+        finally:
+            ctx.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    report = {"meta": {"python": platform.python_version(), "sqlite": database.sqlite3.sqlite_version,
+                       "platform": platform.platform(), "years": args.years, "shifts": shifts,
+                       "repeat": args.repeat, "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+              "results": results}
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"РЕГРЕССИЯ {name}: {old:.3f} -> {new:.3f} мс (x{ratio:.2f})", file=sys.stderr)
+        status = 1 if regressions else 0
+    for name, r in results.items():
+        suffix = f"  x{r['ratio']:.2f}" if "ratio" in r else ""
+        print(f"{name:<45} {r['median_ms']:>10.3f} мс  (min {r['min_ms']:.3f}){suffix}", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    elif not args.compare:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
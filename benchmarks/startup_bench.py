@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# Замер холодного старта: время импортов (python -X importtime) и время до первой отрисовки календаря.
+# Каждый замер идёт в отдельном процессе, чтобы модули не были уже загружены.
+#   python benchmarks/startup_bench.py [--runs 5] [--output startup.json]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# модули, которые не должны тянуть tkinter
+HEADLESS_MODULES = ["database", "calculations", "profile_manager", "repository", "ledger", "month_view",
+                    "payroll", "events", "replica", "team_report", "export", "importer", "registry", "worker", "instrument",
+                    "session", "settings"]
+
+def _python(args, env=None):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, text=True, env=env)
+
+def import_times(module):
+    # {модуль: (self мкс, cumulative мкс)} по выводу -X importtime
+    proc = _python(["-X", "importtime", "-c", f"import {module}"])
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line: continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+def headless_check():
+    code = ("import sys\n"
+            + "".join(f"import salary_calendar.{m}\n" for m in HEADLESS_MODULES)
+            + "print(sorted(m for m in sys.modules if m == 'tkinter' or m.startswith('tkinter.')))")
+    proc = _python(["-c", code])
+    return json.loads(proc.stdout.replace("'", '"')) if proc.returncode == 0 else [proc.stderr.strip().splitlines()[-1]]
+
+def first_paint_child(profiles_dir):
+    # Выполняется в дочернем процессе: от старта интерпретатора до отрисованной сетки месяца.
+    import time
+    started = time.perf_counter()
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(json.dumps({"skipped": str(e)}))
+        return
+    root.withdraw()
+    from salary_calendar.profile_manager import ProfileManager
+    # кэш каталога — во временной папке, а не в ~/.salary_calendar пользователя
+    manager = ProfileManager(profiles_dir, catalog_file=os.path.join(profiles_dir, "profiles.json"))
+    manager.get_profiles()
+    from salary_calendar.interface import CalendarApp
+    imported = time.perf_counter()
+    app = CalendarApp(root, "bench", manager)
+    root.deiconify()
+    root.update()
+    window_shown = time.perf_counter()
+    while not app.ready:
+        root.update()
+    root.update_idletasks()
+    painted = time.perf_counter()
+    root.destroy()
+    print(json.dumps({"imports_ms": (imported - started) * 1000, "window_ms": (window_shown - started) * 1000,
+                      "first_paint_ms": (painted - started) * 1000}))
+
+def first_paint(runs):
+    results = []
+    with tempfile.TemporaryDirectory() as profiles_dir:
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        for _ in range(runs):
+            proc = _python([os.path.abspath(__file__), "--child-paint", profiles_dir], env=env)
+            if proc.returncode != 0:
+                return {"error": proc.stderr.strip().splitlines()[-1]}
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            if "skipped" in result:
+                return result
+            results.append(result)
+    return {key: round(statistics.median(r[key] for r in results), 1) for key in results[0]}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер холодного старта")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="сколько самых дорогих импортов показать")
+    parser.add_argument("--output", help="файл JSON (по умолчанию stdout)")
+    parser.add_argument("--child-paint", metavar="PROFILES_DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child_paint:
+        first_paint_child(args.child_paint)
+        return 0
+    report = {"python": sys.version.split()[0], "imports": {}}
+    for module in ("salary_calendar.profile_manager", "salary_calendar.interface"):
+        runs = [import_times(module) for _ in range(args.runs)]
+        total = statistics.median(r[module][1] for r in runs)
+        heaviest = sorted(runs[-1].items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+        report["imports"][module] = {"cumulative_ms": round(total / 1000, 1),
+                                     "heaviest": [{"module": m, "self_ms": round(own / 1000, 1), "cumulative_ms": round(cum / 1000, 1)}
+                                                  for m, (own, cum) in heaviest]}
+    report["tkinter_in_headless_modules"] = headless_check()
+    report["first_paint"] = first_paint(args.runs)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
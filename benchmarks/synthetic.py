@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# Генератор синтетических профилей для бенчмарков: несколько лет смен с недоработками,
+# переработками и выходами в выходные, посчитанных по тем же правилам, что и в календаре.
+#   python benchmarks/synthetic.py out.db [--years 3] [--start-year 2024] [--seed 1]
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from salary_calendar import calculations, database
+from salary_calendar.holidays import load_manual_holidays
+
+SALARY = Decimal('90610.5')
+LUNCH_MIN = 60
+
+def _hhmm(minutes):
+    minutes %= 1440
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def generate_shifts(start_year, years, seed=0, salary=SALARY, lunch_min=LUNCH_MIN,
+                    fill=0.92, undertime=0.15, overtime=0.25, weekend=0.08, overnight=0.01, pending=0.5):
+    # строки для database.save_shifts; доли — вероятности на рабочий день (weekend — на выходной),
+    # pending — доля переработок, оставленных неоплаченными для «Обработать переработки»
+    rng = random.Random(seed)
+    holidays_set, _names = load_manual_holidays(range(start_year, start_year + years))
+    prod_cal = calculations.ProductionCalendar(holidays_set)
+    required = 480 + lunch_min
+    rows = []
+    d = date(start_year, 1, 1)
+    end = date(start_year + years, 1, 1)
+    while d < end:
+        off = prod_cal.is_day_off(d)
+        if (rng.random() < weekend) if off else (rng.random() < fill):
+            start = rng.randint(7 * 60, 9 * 60 + 30)
+            if off:
+                duration = rng.randint(4 * 60, 9 * 60)
+            elif rng.random() < overnight:
+                start = rng.randint(20 * 60, 22 * 60)
+                duration = required + rng.randint(0, 120)
+            else:
+                p = rng.random()
+                if p < undertime:
+                    duration = required - rng.randint(5, 180)
+                elif p < undertime + overtime:
+                    duration = required + rng.randint(5, 240)
+                else:
+                    duration = required
+            act, end_time = _hhmm(start), _hhmm(start + duration)
+            duration = calculations.shift_duration_min(act, end_time)
+            hourly = prod_cal.hourly_rate_cents(d.year, d.month, salary)
+            under, over, day_pay, ot_pay = calculations.compute_shift_cents(duration, hourly, required, lunch_min, off)
+            if over and rng.random() < pending:
+                ot_pay = 0
+            notes = "синтетическая смена" if rng.random() < 0.05 else ""
+            rows.append((d.isoformat(), act, end_time, duration, under, over, day_pay, ot_pay, notes))
+        d += timedelta(days=1)
+    return rows
+
+def generate_profile(path, years=3, start_year=2024, seed=0, salary=SALARY, lunch_min=LUNCH_MIN, **options):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = database.connect(path)
+    try:
+        database.init_db(conn)
+        with database.transaction(conn):
+            conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                             [('salary', str(salary)), ('lunch_min', str(lunch_min))])
+            rows = generate_shifts(start_year, years, seed, salary, lunch_min, **options)
+            database.save_shifts(conn, rows)
+    finally:
+        conn.close()
+    return len(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Синтетический профиль для бенчмарков")
+    parser.add_argument("path")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--start-year", type=int, default=2024)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fill", type=float, default=0.92, help="доля рабочих дней со сменой")
+    parser.add_argument("--undertime", type=float, default=0.15)
+    parser.add_argument("--overtime", type=float, default=0.25)
+    parser.add_argument("--weekend", type=float, default=0.08, help="доля выходных со сменой")
+    parser.add_argument("--pending", type=float, default=0.5, help="доля нераспределённых переработок")
+    args = parser.parse_args(argv)
+    count = generate_profile(args.path, args.years, args.start_year, args.seed, fill=args.fill,
+                             undertime=args.undertime, overtime=args.overtime, weekend=args.weekend,
+                             pending=args.pending)
+    print(f"{args.path}: {count} смен")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,8 @@
 import tkinter as tk
 from tkinter import ttk
 from salary_calendar.utils import center_window
-from salary_calendar.interface import CalendarApp
 from salary_calendar.profile_manager import ProfileManager
+from salary_calendar import instrument
 
 def choose_profile(root, manager):
     profile = None
@@ -24,6 +24,7 @@ def choose_profile(root, manager):
     return profile
 
 def main():
+    instrument.enable_from_env()
     manager = ProfileManager()
     while True:
         root = tk.Tk()
@@ -31,6 +32,8 @@ def main():
         profile = choose_profile(root, manager)
         if not profile:
             break
+        # интерфейс календаря импортируется только после выбора профиля
+        from salary_calendar.interface import CalendarApp
         app = CalendarApp(root, profile, manager)
         root.deiconify()
         root.mainloop()
@@ -1,4 +1,6 @@
 import calendar
+from collections import namedtuple
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from .constants import DEC, money_to_cents
 
@@ -14,10 +16,90 @@ def working_days_in_month(year: int, month: int, holidays_set: set) -> int:
     return cnt
 
 def hourly_rate_for_month(year: int, month: int, holidays_set: set, base_amount: Decimal) -> Decimal:
-    wd = working_days_in_month(year, month, holidays_set)
+    return hourly_rate_for_working_days(working_days_in_month(year, month, holidays_set), base_amount)
+
+def hourly_rate_for_working_days(wd: int, base_amount: Decimal) -> Decimal:
     if wd <= 0: return DEC('0.00')
     return (base_amount / DEC(wd) / DEC(8)).quantize(DEC('0.01'))
 
+def time_to_min(s):
+    # "HH:MM" -> минуты от полуночи, None если строка не разбирается
+    try:
+        t = datetime.strptime(s, "%H:%M")
+    except:
+        return None
+    return t.hour * 60 + t.minute
+
+def shift_duration_min(act, end) -> int:
+    if not act or not end: return 0
+    try:
+        act_dt = datetime.strptime(act, "%H:%M")
+        end_dt = datetime.strptime(end, "%H:%M")
+        if end_dt < act_dt: end_dt += timedelta(days=1)
+        return int((end_dt - act_dt).total_seconds() / 60)
+    except:
+        return 0
+
+def compute_shift(duration_min: int, hourly_rate: Decimal, required_minutes: int, lunch_min: int, is_weekend: bool):
+    # (undertime_min, overtime_min, day_pay_cents, overtime_pay_cents) для одной смены
+    if not is_weekend:
+        undertime_min = max(0, required_minutes - duration_min)
+        overtime_min = max(0, duration_min - required_minutes)
+        return undertime_min, overtime_min, day_base_pay(hourly_rate), calc_overtime_pay_minutes(overtime_min, hourly_rate)
+    return 0, 0, weekend_pay_for_duration(duration_min, hourly_rate, lunch_min), 0
+
+MonthInfo = namedtuple("MonthInfo", "days working_days weekend_mask holiday_mask off_mask")
+
+class ProductionCalendar:
+    # Индекс производственного календаря по (год, месяц): число рабочих дней и битовые маски
+    # выходных/праздников (бит i — день i+1) считаются один раз, ставки кэшируются по окладу.
+    # После изменения набора праздников индекс нужно сбросить через invalidate().
+    def __init__(self, holidays_set: set):
+        self.holidays_set = holidays_set
+        self._months = {}
+        self._rates = {}
+
+    def invalidate(self, holidays_set: set = None):
+        if holidays_set is not None:
+            self.holidays_set = holidays_set
+        self._months.clear()
+        self._rates.clear()
+
+    def month(self, year: int, month: int) -> MonthInfo:
+        info = self._months.get((year, month))
+        if info is None:
+            days = calendar.monthrange(year, month)[1]
+            first_weekday = date(year, month, 1).weekday()
+            weekend_mask = 0
+            holiday_mask = 0
+            for i in range(days):
+                if (first_weekday + i) % 7 >= 5: weekend_mask |= 1 << i
+                if date(year, month, i + 1) in self.holidays_set: holiday_mask |= 1 << i
+            off_mask = weekend_mask | holiday_mask
+            info = MonthInfo(days, days - bin(off_mask).count("1"), weekend_mask, holiday_mask, off_mask)
+            self._months[(year, month)] = info
+        return info
+
+    def working_days(self, year: int, month: int) -> int:
+        return self.month(year, month).working_days
+
+    def is_day_off(self, d: date) -> bool:
+        return bool(self.month(d.year, d.month).off_mask >> (d.day - 1) & 1)
+
+    def hourly_rate(self, year: int, month: int, base_amount: Decimal) -> Decimal:
+        key = (year, month, base_amount)
+        rate = self._rates.get(key)
+        if rate is None:
+            rate = self._rates[key] = hourly_rate_for_working_days(self.working_days(year, month), base_amount)
+        return rate
+
+    def hourly_rate_cents(self, year: int, month: int, base_amount: Decimal) -> int:
+        key = (year, month, base_amount, "cents")
+        rate = self._rates.get(key)
+        if rate is None:
+            rate = self._rates[key] = hourly_rate_cents(self.working_days(year, month), base_amount)
+        return rate
+
 def day_base_pay(hourly_rate: Decimal) -> int:
     return money_to_cents((hourly_rate * DEC(8)).quantize(DEC('0.01')))
 
@@ -36,4 +118,85 @@ def weekend_pay_for_duration(duration_min: int, hourly_rate: Decimal, lunch_min:
     work_minutes = duration_min or 0
     if work_minutes > 240:
         work_minutes -= lunch_min
-    return calc_overtime_pay_minutes(work_minutes, hourly_rate, is_weekend=True)
\ No newline at end of file
+    return calc_overtime_pay_minutes(work_minutes, hourly_rate, is_weekend=True)
+
+# Целочисленный путь: копейки и минуты вместо Decimal, результат совпадает с Decimal-путём до копейки.
+# quantize(DEC('0.01')) выше округляет по контексту Decimal (ROUND_HALF_EVEN), money_to_cents —
+# ROUND_HALF_UP уже точных копеек, поэтому здесь все округления до копейки — половина к чётному.
+# Decimal-путь делит минуты на 60 с точностью 28 знаков; это влияет только на точную половину
+# копейки, и в этом случае шаги Decimal-вычисления воспроизводятся той же точностью на целых.
+
+DECIMAL_PREC = 28
+
+def _div_half_even(num: int, den: int) -> int:
+    q, r = divmod(num, den)
+    if 2 * r > den or (2 * r == den and q % 2): q += 1
+    return q
+
+def _round_sig(num: int, den: int):
+    # num/den (>= 0), округлённое до DECIMAL_PREC значащих цифр, как арифметика Decimal по умолчанию
+    if num == 0: return 0, 1
+    exp = len(str(num)) - len(str(den)) - DECIMAL_PREC
+    while True:
+        n, d = (num, den * 10 ** exp) if exp >= 0 else (num * 10 ** -exp, den)
+        q, r = divmod(n, d)
+        if q >= 10 ** DECIMAL_PREC: exp += 1
+        elif q < 10 ** (DECIMAL_PREC - 1): exp -= 1
+        else: break
+    if 2 * r > d or (2 * r == d and q % 2): q += 1
+    return (q * 10 ** exp, 1) if exp >= 0 else (q, 10 ** -exp)
+
+def hourly_rate_cents(wd: int, base_amount: Decimal) -> int:
+    if wd <= 0: return 0
+    num, den = base_amount.as_integer_ratio()
+    if den <= 100:
+        return _div_half_even(num * 100, den * wd * 8)
+    n, d = _round_sig(num, den * wd)
+    n, d = _round_sig(n, d * 8)
+    return _div_half_even(n * 100, d)
+
+def day_base_pay_cents(hourly_cents: int) -> int:
+    return hourly_cents * 8
+
+def _stepwise_overtime_pay_cents(overtime_min: int, hourly_cents: int, is_weekend: bool) -> int:
+    def part(factor_tenths, minutes):
+        # hourly * factor * (minutes / 60) с промежуточными округлениями Decimal
+        m_num, m_den = _round_sig(minutes, 60)
+        return _round_sig(hourly_cents * factor_tenths * m_num, 1000 * m_den)
+    if is_weekend:
+        num, den = part(20, overtime_min)
+    else:
+        f_num, f_den = part(15, min(overtime_min, 120))
+        r_num, r_den = part(20, max(0, overtime_min - 120))
+        num, den = _round_sig(f_num * r_den + r_num * f_den, f_den * r_den)
+    return _div_half_even(num * 100, den)
+
+def overtime_pay_cents(overtime_min: int, hourly_cents: int, is_weekend=False) -> int:
+    if overtime_min <= 0: return 0
+    if is_weekend:
+        num, den = hourly_cents * overtime_min, 30
+        inexact = overtime_min % 3
+    else:
+        first = min(overtime_min, 120)
+        rest = max(0, overtime_min - 120)
+        num, den = hourly_cents * (3 * first + 4 * rest), 120
+        inexact = first % 3 or rest % 3
+    q, r = divmod(num, den)
+    if 2 * r == den and inexact:
+        return _stepwise_overtime_pay_cents(overtime_min, hourly_cents, is_weekend)
+    if 2 * r > den or (2 * r == den and q % 2): q += 1
+    return q
+
+def weekend_pay_for_duration_cents(duration_min: int, hourly_cents: int, lunch_min: int) -> int:
+    work_minutes = duration_min or 0
+    if work_minutes > 240:
+        work_minutes -= lunch_min
+    return overtime_pay_cents(work_minutes, hourly_cents, is_weekend=True)
+
+def compute_shift_cents(duration_min: int, hourly_cents: int, required_minutes: int, lunch_min: int, is_weekend: bool):
+    # То же, что compute_shift, но со ставкой в копейках
+    if not is_weekend:
+        undertime_min = max(0, required_minutes - duration_min)
+        overtime_min = max(0, duration_min - required_minutes)
+        return undertime_min, overtime_min, day_base_pay_cents(hourly_cents), overtime_pay_cents(overtime_min, hourly_cents)
+    return 0, 0, weekend_pay_for_duration_cents(duration_min, hourly_cents, lunch_min), 0
@@ -2,6 +2,9 @@ from decimal import Decimal, ROUND_HALF_UP
 
 DEC = Decimal
 
+# Каталог профилей на файловом сервере
+PROFILES_DIR = r"\\mdc\Public\Калмыков Владимир Алексеевич\Calendar"
+
 def money_to_cents(amount: Decimal) -> int:
     return int((amount * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
 
@@ -1,4 +1,79 @@
+import os
 import sqlite3
+import urllib.parse
+from contextlib import contextmanager
+from datetime import date
+
+# PRAGMA для БД профиля на сетевой шаре: WAL и mmap там небезопасны,
+# поэтому остаётся журнал DELETE, выигрыш даёт кэш страниц и synchronous=NORMAL.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "NORMAL",
+    "cache_size": -8000,
+    "mmap_size": 0,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+# Для локальной реплики можно отображать файл в память.
+LOCAL_PRAGMAS = dict(DEFAULT_PRAGMAS, mmap_size=268435456)
+
+class Connection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursors = {}
+        self.tx_depth = 0
+
+# Класс соединений; instrument.enable() подменяет его на вариант с замерами
+connection_factory = Connection
+
+def connect(path, pragmas=None, read_only=False, **kwargs):
+    if read_only:
+        # file:///C:/..., file:////server/share/... — без authority, которую SQLite не принимает
+        p = os.path.abspath(path).replace(os.sep, "/")
+        if not p.startswith("/"): p = "/" + p
+        uri = "file://" + urllib.parse.quote(p, safe="/:") + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, factory=connection_factory, cached_statements=256, **kwargs)
+    else:
+        conn = sqlite3.connect(path, factory=connection_factory, cached_statements=256, **kwargs)
+    settings = dict(DEFAULT_PRAGMAS)
+    settings.update(pragmas or {})
+    for key, value in settings.items():
+        if read_only and key == "journal_mode": continue
+        conn.execute(f"PRAGMA {key}={value}")
+    return conn
+
+def statement_cursor(conn, name):
+    # Долгоживущий курсор на каждый частый запрос; у обычного sqlite3.Connection — новый курсор.
+    cursors = getattr(conn, "cursors", None)
+    if cursors is None:
+        return conn.cursor()
+    cur = cursors.get(name)
+    if cur is None:
+        cur = cursors[name] = conn.cursor()
+    return cur
+
+@contextmanager
+def transaction(conn):
+    # Одно логическое действие — одна фиксация; вложенные блоки входят во внешнюю транзакцию.
+    if getattr(conn, "tx_depth", 0):
+        conn.tx_depth += 1
+        try:
+            yield conn
+        finally:
+            conn.tx_depth -= 1
+        return
+    if hasattr(conn, "tx_depth"):
+        conn.tx_depth = 1
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        if hasattr(conn, "tx_depth"):
+            conn.tx_depth = 0
 
 def init_db(conn):
     cur = conn.cursor()
@@ -18,40 +93,81 @@ def init_db(conn):
         value TEXT
     )""")
     conn.commit()
+    migrate(conn)
+
+# Миграции схемы по PRAGMA user_version; выполняются при каждом открытии профиля.
+MIGRATIONS = [
+    # 1: частичные индексы для нераспределённых переработок и открытых недоработок
+    [
+        """CREATE INDEX IF NOT EXISTS idx_shifts_pending_overtime ON shifts(day)
+           WHERE overtime_min > 0 AND (overtime_pay_cents IS NULL OR overtime_pay_cents = 0)""",
+        "CREATE INDEX IF NOT EXISTS idx_shifts_open_undertime ON shifts(day) WHERE undertime_min > 0",
+    ],
+]
+
+def migrate(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= len(MIGRATIONS): return
+    with transaction(conn):
+        for statements in MIGRATIONS[version:]:
+            for sql in statements:
+                conn.execute(sql)
+        conn.execute(f"PRAGMA user_version={len(MIGRATIONS)}")
+
+def period_bounds(year=None, month=None):
+    # Полуоткрытый диапазон дат [start, end) для месяца, года или всей истории.
+    if year and month:
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return date(year, month, 1).isoformat(), end.isoformat()
+    if year:
+        return date(year, 1, 1).isoformat(), date(year + 1, 1, 1).isoformat()
+    return "0000-01-01", "9999-12-31"
+
+SAVE_SHIFT_SQL = """
+    INSERT INTO shifts(day, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes)
+    VALUES(?,?,?,?,?,?,?,?,?)
+    ON CONFLICT(day) DO UPDATE SET
+      activation=excluded.activation, end=excluded.end, duration_min=excluded.duration_min,
+      undertime_min=excluded.undertime_min, overtime_min=excluded.overtime_min,
+      day_pay_cents=excluded.day_pay_cents, overtime_pay_cents=excluded.overtime_pay_cents, notes=excluded.notes
+"""
 
 def load_shift(conn, day_iso):
-    cur = conn.cursor()
+    cur = statement_cursor(conn, "load_shift")
     cur.execute("SELECT activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes FROM shifts WHERE day=?", (day_iso,))
     return cur.fetchone()
 
+def load_shifts_between(conn, start_iso, end_iso):
+    cur = statement_cursor(conn, "load_shifts_between")
+    cur.execute("SELECT day, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes FROM shifts WHERE day BETWEEN ? AND ?", (start_iso, end_iso))
+    return {row[0]: row[1:] for row in cur.fetchall()}
+
 def save_shift(conn, day_iso, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes):
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO shifts(day, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes)
-        VALUES(?,?,?,?,?,?,?,?,?)
-        ON CONFLICT(day) DO UPDATE SET
-          activation=excluded.activation, end=excluded.end, duration_min=excluded.duration_min,
-          undertime_min=excluded.undertime_min, overtime_min=excluded.overtime_min,
-          day_pay_cents=excluded.day_pay_cents, overtime_pay_cents=excluded.overtime_pay_cents, notes=excluded.notes
-    """, (day_iso, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes))
-    conn.commit()
+    with transaction(conn):
+        cur = statement_cursor(conn, "save_shift")
+        cur.execute(SAVE_SHIFT_SQL, (day_iso, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes))
+
+def save_shifts(conn, rows):
+    # rows: (day, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes)
+    with transaction(conn):
+        cur = statement_cursor(conn, "save_shifts")
+        cur.executemany(SAVE_SHIFT_SQL, rows)
 
 def delete_shift(conn, day_iso):
-    cur = conn.cursor()
-    cur.execute("DELETE FROM shifts WHERE day=?", (day_iso,))
-    conn.commit()
+    with transaction(conn):
+        cur = statement_cursor(conn, "delete_shift")
+        cur.execute("DELETE FROM shifts WHERE day=?", (day_iso,))
 
 def find_pending_overtimes(conn, year=None, month=None):
-    cur = conn.cursor()
+    cur = statement_cursor(conn, "find_pending_overtimes")
     if year and month:
         cur.execute("""
             SELECT day, overtime_min FROM shifts
             WHERE overtime_min > 0
               AND (overtime_pay_cents IS NULL OR overtime_pay_cents = 0)
-              AND strftime('%Y', day) = ? 
-              AND strftime('%m', day) = ?
+              AND day >= ? AND day < ?
             ORDER BY day
-        """, (str(year), f"{month:02d}"))
+        """, period_bounds(year, month))
     else:
         cur.execute("""
             SELECT day, overtime_min FROM shifts
@@ -62,6 +178,18 @@ def find_pending_overtimes(conn, year=None, month=None):
     return cur.fetchall()
 
 def list_shifts_between(conn, start_iso, end_iso):
-    cur = conn.cursor()
+    cur = statement_cursor(conn, "list_shifts_between")
     cur.execute("SELECT * FROM shifts WHERE day BETWEEN ? AND ? ORDER BY day", (start_iso, end_iso))
-    return cur.fetchall()
\ No newline at end of file
+    return cur.fetchall()
+
+def iter_shifts(conn, start_iso="0000-01-01", end_iso="9999-12-31", chunk_size=500):
+    # Потоковое чтение смен [start, end] порциями fetchmany; отдельный курсор на каждый обход.
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT day, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes FROM shifts WHERE day >= ? AND day <= ? ORDER BY day", (start_iso, end_iso))
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows: break
+            yield from rows
+    finally:
+        cur.close()
@@ -1,25 +1,26 @@
 from .constants import cents_to_money
+from .database import statement_cursor, transaction, period_bounds
 import calendar
 from datetime import date
 
 def add_overtime_pay(conn, day_iso: str, add_cents: int):
     if add_cents <= 0: return
-    cur = conn.cursor()
-    cur.execute("SELECT overtime_pay_cents, notes FROM shifts WHERE day=?", (day_iso,))
-    row = cur.fetchone()
-    if row:
-        cur_val = row[0] or 0
-        notes = row[1] or ""
-        new_val = cur_val + add_cents
-        notes = (notes + "\n" if notes else "") + f"Добавлена доп.оплата: {cents_to_money(add_cents)} руб"
-        cur.execute("UPDATE shifts SET overtime_pay_cents=?, notes=? WHERE day=?", (new_val, notes, day_iso))
-    else:
-        notes = f"Добавлена доп.оплата: {cents_to_money(add_cents)} руб"
-        cur.execute("INSERT INTO shifts(day, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes) VALUES(?,?,?,?,?,?,?,?,?)", (day_iso, None, None, None, 0, 0, 0, add_cents, notes))
-    conn.commit()
+    with transaction(conn):
+        cur = statement_cursor(conn, "add_overtime_pay")
+        cur.execute("SELECT overtime_pay_cents, notes FROM shifts WHERE day=?", (day_iso,))
+        row = cur.fetchone()
+        if row:
+            cur_val = row[0] or 0
+            notes = row[1] or ""
+            new_val = cur_val + add_cents
+            notes = (notes + "\n" if notes else "") + f"Добавлена доп.оплата: {cents_to_money(add_cents)} руб"
+            cur.execute("UPDATE shifts SET overtime_pay_cents=?, notes=? WHERE day=?", (new_val, notes, day_iso))
+        else:
+            notes = f"Добавлена доп.оплата: {cents_to_money(add_cents)} руб"
+            cur.execute("INSERT INTO shifts(day, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes) VALUES(?,?,?,?,?,?,?,?,?)", (day_iso, None, None, None, 0, 0, 0, add_cents, notes))
 
 def distribute_overtime_minutes(conn, year: int, month: int, half: int, source_day_iso: str, available_overtime_min: int):
-    cur = conn.cursor()
+    cur = statement_cursor(conn, "distribute_overtime_minutes")
     used_map = {}
     if available_overtime_min <= 0: return available_overtime_min, used_map
     if half == 1:
@@ -29,33 +30,91 @@ def distribute_overtime_minutes(conn, year: int, month: int, half: int, source_d
         last = calendar.monthrange(year, month)[1]
         start = date(year, month, 16)
         end = date(year, month, last)
-    cur.execute("SELECT day, undertime_min FROM shifts WHERE day BETWEEN ? AND ? AND undertime_min>0 ORDER BY day ASC", (start.isoformat(), end.isoformat()))
-    rows = cur.fetchall()
-    for r in rows:
-        day_iso, undertime = r[0], r[1] or 0
-        if day_iso == source_day_iso: continue
-        if available_overtime_min <= 0: break
-        if undertime <= 0: continue
-        take = min(undertime, available_overtime_min)
-        new_undertime = undertime - take
-        cur.execute("SELECT notes FROM shifts WHERE day=?", (day_iso,))
-        nrow = cur.fetchone()
-        notes_target = (nrow[0] or "")
-        notes_target = (notes_target + "\n" if notes_target else "") + f"Закрыто переработкой {take} мин (источник {source_day_iso})"
-        cur.execute("UPDATE shifts SET undertime_min=?, notes=? WHERE day=?", (new_undertime, notes_target, day_iso))
-        conn.commit()
-        used_map[day_iso] = take
-        available_overtime_min -= take
-    if used_map:
-        total_used = sum(used_map.values())
-        cur.execute("SELECT overtime_min, notes FROM shifts WHERE day=?", (source_day_iso,))
-        row = cur.fetchone()
-        if row:
-            cur_overtime = row[0] or 0
-            cur_notes = row[1] or ""
-            new_overtime = max(0, cur_overtime - total_used)
-            used_info = "; ".join([f"{d}:{m}min" for d,m in used_map.items()])
-            cur_notes = (cur_notes + "\n" if cur_notes else "") + f"Использовано для закрытия: {used_info}"
-            cur.execute("UPDATE shifts SET overtime_min=?, notes=? WHERE day=?", (new_overtime, cur_notes, source_day_iso))
-            conn.commit()
-    return available_overtime_min, used_map
\ No newline at end of file
+    with transaction(conn):
+        cur.execute("SELECT day, undertime_min, notes FROM shifts WHERE undertime_min > 0 AND day >= ? AND day <= ? ORDER BY day ASC", (start.isoformat(), end.isoformat()))
+        rows = cur.fetchall()
+        updates = []
+        for r in rows:
+            day_iso, undertime = r[0], r[1] or 0
+            if day_iso == source_day_iso: continue
+            if available_overtime_min <= 0: break
+            if undertime <= 0: continue
+            take = min(undertime, available_overtime_min)
+            new_undertime = undertime - take
+            notes_target = (r[2] or "")
+            notes_target = (notes_target + "\n" if notes_target else "") + f"Закрыто переработкой {take} мин (источник {source_day_iso})"
+            updates.append((new_undertime, notes_target, day_iso))
+            used_map[day_iso] = take
+            available_overtime_min -= take
+        if updates:
+            cur.executemany("UPDATE shifts SET undertime_min=?, notes=? WHERE day=?", updates)
+        if used_map:
+            total_used = sum(used_map.values())
+            cur.execute("SELECT overtime_min, notes FROM shifts WHERE day=?", (source_day_iso,))
+            row = cur.fetchone()
+            if row:
+                cur_overtime = row[0] or 0
+                cur_notes = row[1] or ""
+                new_overtime = max(0, cur_overtime - total_used)
+                used_info = "; ".join([f"{d}:{m}min" for d,m in used_map.items()])
+                cur_notes = (cur_notes + "\n" if cur_notes else "") + f"Использовано для закрытия: {used_info}"
+                cur.execute("UPDATE shifts SET overtime_min=?, notes=? WHERE day=?", (new_overtime, cur_notes, source_day_iso))
+    return available_overtime_min, used_map
+
+def distribute_pending_overtime(conn, year=None, month=None):
+    # Все переработки и недоработки периода загружаются одним запросом, сопоставляются в памяти
+    # по тем же правилам, что и distribute_overtime_minutes (источники и цели по возрастанию даты,
+    # в пределах своей половины месяца), и записываются одной транзакцией.
+    start_iso, end_iso = period_bounds(year, month)
+    summary = {"sources": 0, "targets": 0, "used_min": 0, "remaining_min": 0, "changed_days": []}
+    with transaction(conn):
+        # диапазон дат идёт по первичному ключу (SEARCH ... sqlite_autoindex_shifts_1); частичные индексы
+        # под это OR планировщик не выбирает, они работают в find_pending_overtimes и поиске недоработок
+        cur = statement_cursor(conn, "distribute_pending_overtime")
+        cur.execute("""
+            SELECT day, undertime_min, overtime_min, overtime_pay_cents, notes FROM shifts
+            WHERE day >= ? AND day < ?
+              AND (undertime_min > 0 OR (overtime_min > 0 AND (overtime_pay_cents IS NULL OR overtime_pay_cents = 0)))
+            ORDER BY day
+        """, (start_iso, end_iso))
+        rows = {}
+        halves = {}
+        for day_iso, undertime, overtime, ot_pay, notes in cur.fetchall():
+            rows[day_iso] = {"undertime": undertime or 0, "overtime": overtime or 0, "notes": notes or "", "pending": (overtime or 0) > 0 and not ot_pay}
+            half = (day_iso[:7], 1 if int(day_iso[8:10]) <= 15 else 2)
+            halves.setdefault(half, []).append(day_iso)
+        changed = set()
+        targets_closed = set()
+        for days in halves.values():
+            targets = [d for d in days if rows[d]["undertime"] > 0]
+            for source_day_iso in days:
+                source = rows[source_day_iso]
+                if not source["pending"]: continue
+                available = source["overtime"]
+                used_map = {}
+                for day_iso in targets:
+                    if day_iso == source_day_iso: continue
+                    if available <= 0: break
+                    target = rows[day_iso]
+                    if target["undertime"] <= 0: continue
+                    take = min(target["undertime"], available)
+                    target["undertime"] -= take
+                    target["notes"] = (target["notes"] + "\n" if target["notes"] else "") + f"Закрыто переработкой {take} мин (источник {source_day_iso})"
+                    used_map[day_iso] = take
+                    available -= take
+                    changed.add(day_iso)
+                    targets_closed.add(day_iso)
+                if used_map:
+                    used_info = "; ".join([f"{d}:{m}min" for d, m in used_map.items()])
+                    source["overtime"] = max(0, source["overtime"] - sum(used_map.values()))
+                    source["notes"] = (source["notes"] + "\n" if source["notes"] else "") + f"Использовано для закрытия: {used_info}"
+                    changed.add(source_day_iso)
+                    summary["sources"] += 1
+                    summary["used_min"] += sum(used_map.values())
+        if changed:
+            cur.executemany("UPDATE shifts SET undertime_min=?, overtime_min=?, notes=? WHERE day=?",
+                            [(rows[d]["undertime"], rows[d]["overtime"], rows[d]["notes"], d) for d in sorted(changed)])
+    summary["targets"] = len(targets_closed)
+    summary["remaining_min"] = sum(r["overtime"] for r in rows.values() if r["pending"])
+    summary["changed_days"] = sorted(changed)
+    return summary
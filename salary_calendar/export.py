@@ -0,0 +1,73 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from . import database
+from .constants import PROFILES_DIR, cents_to_money, format_minutes_hhmm
+
+FIELDS = ["day", "activation", "end", "duration", "undertime", "overtime", "day_pay", "overtime_pay", "notes"]
+
+def format_shift(row):
+    day, activation, end, duration, undertime, overtime, day_pay, ot_pay, notes = row
+    return {
+        "day": day,
+        "activation": activation or "",
+        "end": end or "",
+        "duration": format_minutes_hhmm(duration or 0),
+        "undertime": format_minutes_hhmm(undertime or 0),
+        "overtime": format_minutes_hhmm(overtime or 0),
+        "day_pay": str(cents_to_money(day_pay or 0)),
+        "overtime_pay": str(cents_to_money(ot_pay or 0)),
+        "notes": notes or "",
+    }
+
+def export_records(conn, start_iso="0000-01-01", end_iso="9999-12-31", chunk_size=500):
+    return map(format_shift, database.iter_shifts(conn, start_iso, end_iso, chunk_size))
+
+def write_csv(records, out):
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    count = 0
+    for rec in records:
+        writer.writerow(rec)
+        count += 1
+    return count
+
+def write_jsonl(records, out):
+    count = 0
+    for rec in records:
+        out.write(json.dumps(rec, ensure_ascii=False))
+        out.write("\n")
+        count += 1
+    return count
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+
+def export_shifts(conn, out, fmt="csv", start_iso="0000-01-01", end_iso="9999-12-31", chunk_size=500):
+    return WRITERS[fmt](export_records(conn, start_iso, end_iso, chunk_size), out)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Выгрузка смен профиля в CSV или JSON Lines")
+    parser.add_argument("profile", help="имя профиля или путь к .db")
+    parser.add_argument("--profiles-dir", default=PROFILES_DIR)
+    parser.add_argument("--from", dest="start", default="0000-01-01", help="первый день, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", default="9999-12-31", help="последний день, YYYY-MM-DD")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    parser.add_argument("--output", help="файл выгрузки (по умолчанию stdout)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args(argv)
+    db_path = args.profile if args.profile.endswith('.db') else os.path.join(args.profiles_dir, f"{args.profile}.db")
+    if not os.path.isfile(db_path):
+        parser.error(f"нет БД профиля: {db_path}")
+    conn = database.connect(db_path, read_only=True)
+    try:
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as out:
+                count = export_shifts(conn, out, args.format, args.start, args.end, args.chunk_size)
+        else:
+            count = export_shifts(conn, sys.stdout, args.format, args.start, args.end, args.chunk_size)
+    finally:
+        conn.close()
+    print(f"Выгружено смен: {count}", file=sys.stderr)
+    return 0
@@ -0,0 +1,29 @@
+from datetime import date
+
+# Годы, для которых CalendarApp заполняет праздники
+DEFAULT_YEARS = range(2024, 2028)
+
+def load_manual_holidays(years=DEFAULT_YEARS):
+    hset = set()
+    names = {}
+    for y in years:
+        for mday in range(1, 10):
+            hset.add(date(y, 1, mday))
+            names[date(y, 1, mday)] = "Новогодние каникулы"
+        names[date(y, 1, 7)] = "Рождество"
+        hset.add(date(y, 1, 7))
+        names[date(y, 2, 23)] = "День защитника Отечества"
+        hset.add(date(y, 2, 23))
+        names[date(y, 3, 8)] = "Международный женский день"
+        hset.add(date(y, 3, 8))
+        names[date(y, 5, 1)] = "Праздник труда"
+        hset.add(date(y, 5, 1))
+        names[date(y, 5, 9)] = "День Победы"
+        hset.add(date(y, 5, 9))
+        names[date(y, 6, 12)] = "День России"
+        hset.add(date(y, 6, 12))
+        names[date(y, 11, 4)] = "День единства"
+        hset.add(date(y, 11, 4))
+        names[date(y, 12, 31)] = "Новый год"
+        hset.add(date(y, 12, 31))
+    return hset, names
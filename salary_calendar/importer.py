@@ -0,0 +1,142 @@
+import argparse
+import csv
+import os
+import sys
+from datetime import date
+from . import calculations, database, payroll
+from .constants import PROFILES_DIR, cents_to_money, format_minutes_hhmm
+from .holidays import DEFAULT_YEARS, load_manual_holidays
+from .profile_manager import format_min_to_hhmm
+from .settings import Settings
+
+def _open_reader(f, delimiter=None):
+    header = f.readline()
+    if delimiter is None:
+        delimiter = ';' if header.count(';') > header.count(',') else ','
+    names = [h.strip().lower() for h in next(csv.reader([header], delimiter=delimiter))]
+    return names, csv.reader(f, delimiter=delimiter)
+
+def read_shift_rows(f, delimiter=None):
+    # CSV с колонками day, activation, end[, notes]; -> {day: (activation, end, notes)}
+    names, reader = _open_reader(f, delimiter)
+    idx = {n: names.index(n) for n in ("day", "activation", "end", "notes") if n in names}
+    days = {}
+    errors = 0
+    for rec in reader:
+        if not rec: continue
+        try:
+            day = date.fromisoformat(rec[idx["day"]].strip()).isoformat()
+            times = []
+            for col in ("activation", "end"):
+                value = rec[idx[col]].strip()
+                minutes = calculations.time_to_min(value) if value else None
+                if value and minutes is None: raise ValueError(value)
+                times.append(format_min_to_hhmm(minutes) if minutes is not None else None)
+            notes = rec[idx["notes"]].strip() if "notes" in idx and len(rec) > idx["notes"] else ""
+        except (ValueError, IndexError, KeyError):
+            errors += 1
+            continue
+        days[day] = (times[0], times[1], notes)
+    return days, errors
+
+def read_turnstile_events(f, delimiter=None):
+    # Выгрузка турникета: колонка time/timestamp с "YYYY-MM-DD HH:MM[:SS]"; первое событие дня —
+    # активация, последнее — окончание.
+    names, reader = _open_reader(f, delimiter)
+    col = next((names.index(n) for n in ("timestamp", "time", "datetime") if n in names), 0)
+    spans = {}
+    errors = 0
+    for rec in reader:
+        if not rec: continue
+        try:
+            stamp = rec[col].strip().replace("T", " ")
+            day = date.fromisoformat(stamp[:10]).isoformat()
+            minutes = calculations.time_to_min(stamp[11:16])
+            if minutes is None: raise ValueError(stamp)
+        except (ValueError, IndexError):
+            errors += 1
+            continue
+        span = spans.get(day)
+        if span is None:
+            spans[day] = [minutes, minutes]
+        elif minutes < span[0]:
+            span[0] = minutes
+        elif minutes > span[1]:
+            span[1] = minutes
+    # одна отметка за день — смена без окончания
+    return {day: (format_min_to_hhmm(a), format_min_to_hhmm(e) if e != a else None, "") for day, (a, e) in spans.items()}, errors
+
+READERS = {"shifts": read_shift_rows, "events": read_turnstile_events}
+
+def plan_import(conn, parsed, prod_cal, base_amount, lunch_min):
+    # Считает смены по правилам _on_day_click (ставка — один раз на месяц) и сравнивает с БД.
+    days = sorted(parsed)
+    if not days:
+        return [], {"new": 0, "changed": 0, "unchanged": 0}
+    existing = database.load_shifts_between(conn, days[0], days[-1])
+    cols = {"day": days, "activation": [parsed[d][0] for d in days], "end": [parsed[d][1] for d in days]}
+    new = payroll.recompute_columns(cols, prod_cal, base_amount, lunch_min)
+    rows = []
+    counts = {"new": 0, "changed": 0, "unchanged": 0}
+    for i, day in enumerate(days):
+        old = existing.get(day)
+        notes = parsed[day][2] or (old[7] if old else "") or ""
+        row = (day, cols["activation"][i], cols["end"][i], new["duration_min"][i], new["undertime_min"][i],
+               new["overtime_min"][i], new["day_pay_cents"][i], new["overtime_pay_cents"][i], notes)
+        status = "new" if old is None else "unchanged" if tuple(old[:7]) == row[1:8] and (old[7] or "") == notes else "changed"
+        counts[status] += 1
+        if status != "unchanged":
+            rows.append((status, row, old))
+    return rows, counts
+
+def import_file(conn, f, fmt="shifts", dry_run=False, delimiter=None):
+    parsed, errors = READERS[fmt](f, delimiter)
+    settings = Settings.load(conn)
+    prod_cal = calculations.ProductionCalendar(load_manual_holidays(DEFAULT_YEARS)[0])
+    changes, counts = plan_import(conn, parsed, prod_cal, settings.salary, settings.lunch_min)
+    if not dry_run and changes:
+        database.save_shifts(conn, [row for _status, row, _old in changes])
+    counts["errors"] = errors
+    return changes, counts
+
+def describe(status, row, old):
+    pay = cents_to_money((row[6] or 0) + (row[7] or 0))
+    line = f"{'+' if status == 'new' else '~'} {row[0]} {row[1] or '—'}-{row[2] or '—'} {format_minutes_hhmm(row[3])} {pay} руб"
+    if old:
+        line += f" (было {old[0] or '—'}-{old[1] or '—'} {format_minutes_hhmm(old[2] or 0)} {cents_to_money((old[5] or 0) + (old[6] or 0))} руб)"
+    return line
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Импорт смен из CSV или выгрузки турникета")
+    parser.add_argument("profile", help="имя профиля или путь к .db")
+    parser.add_argument("file", help="CSV-файл ('-' — stdin)")
+    parser.add_argument("--profiles-dir", default=PROFILES_DIR)
+    parser.add_argument("--format", choices=sorted(READERS), default="shifts",
+                        help="shifts: day,activation,end[,notes]; events: отметки турникета")
+    parser.add_argument("--delimiter")
+    parser.add_argument("--dry-run", action="store_true", help="только показать изменения")
+    args = parser.parse_args(argv)
+    db_path = args.profile if args.profile.endswith('.db') else os.path.join(args.profiles_dir, f"{args.profile}.db")
+    # connect создал бы пустую БД на месте опечатки в имени профиля
+    if not os.path.isfile(db_path):
+        parser.error(f"нет БД профиля: {db_path}")
+    if args.file != "-" and not os.path.isfile(args.file):
+        parser.error(f"нет файла: {args.file}")
+    # пробный запуск ничего не пишет в БД профиля, даже индексы миграций
+    conn = database.connect(db_path, read_only=args.dry_run)
+    try:
+        if not args.dry_run:
+            database.migrate(conn)
+        if args.file == "-":
+            changes, counts = import_file(conn, sys.stdin, args.format, args.dry_run, args.delimiter)
+        else:
+            with open(args.file, newline="", encoding="utf-8-sig") as f:
+                changes, counts = import_file(conn, f, args.format, args.dry_run, args.delimiter)
+    finally:
+        conn.close()
+    if args.dry_run:
+        for status, row, old in changes:
+            print(describe(status, row, old))
+    print(f"Новых: {counts['new']}, изменено: {counts['changed']}, без изменений: {counts['unchanged']}, "
+          f"ошибок разбора: {counts['errors']}" + (" (пробный запуск)" if args.dry_run else ""), file=sys.stderr)
+    return 0
@@ -0,0 +1,200 @@
+import atexit
+import contextlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from . import database
+
+# Замеры по запросу: SALARY_CALENDAR_INSTRUMENT=1 включает счётчики SQL и фаз интерфейса,
+# SALARY_CALENDAR_PROFILE=1 — ещё и cProfile на всю сессию. Итог пишется в JSON при выходе
+# (SALARY_CALENDAR_STATS — путь, по умолчанию ~/.salary_calendar/stats-<pid>.json).
+ENV_ENABLE = "SALARY_CALENDAR_INSTRUMENT"
+ENV_PROFILE = "SALARY_CALENDAR_PROFILE"
+ENV_OUTPUT = "SALARY_CALENDAR_STATS"
+
+enabled = False
+_lock = threading.Lock()
+_queries = {}
+_phases = {}
+_counters = {}
+_profiling = False
+_profilers = []
+_started = time.time()
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+def normalize_sql(sql):
+    # запросы, отличающиеся только литералами и длиной IN (...), считаются одним
+    sql = _LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("IN (?, ...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+def _record(table, key, seconds, count=1):
+    with _lock:
+        stat = table.get(key)
+        if stat is None:
+            stat = table[key] = [0, 0.0, 0.0]
+        stat[0] += count
+        stat[1] += seconds
+        if seconds > stat[2]:
+            stat[2] = seconds
+
+class TimedCursor(sqlite3.Cursor):
+    # время execute и последующих fetch* относится к нормализованному тексту запроса
+    _key = None
+
+    def execute(self, sql, parameters=()):
+        self._key = normalize_sql(sql)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record(_queries, self._key, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._key = normalize_sql(sql)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record(_queries, self._key, time.perf_counter() - started)
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._key is not None:
+                _record(_queries, self._key, time.perf_counter() - started, count=0)
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, *args):
+        return self._fetch(super().fetchmany, *args)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+class InstrumentedConnection(database.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+@contextlib.contextmanager
+def _timed_phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(_phases, name, time.perf_counter() - started)
+
+_noop = contextlib.nullcontext()
+
+def phase(name):
+    # with instrument.phase("draw"): ... — без включённых замеров ничего не стоит
+    return _timed_phase(name) if enabled else _noop
+
+def profile_thread():
+    # cProfile до 3.12 видит только поток, в котором включён: поток worker (весь SQL и load_month)
+    # заводит свой профайлер при старте. На 3.12+ профайлер Tk-потока уже общий, второй не нужен.
+    if not _profiling: return None
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    with _lock:
+        _profilers.append((threading.current_thread().name, profiler))
+    return profiler
+
+def enable(profile=False, output=None):
+    global enabled, _profiling
+    if enabled: return
+    enabled = True
+    database.connection_factory = InstrumentedConnection
+    if profile:
+        _profiling = True
+        profile_thread()
+    if output is not None:
+        atexit.register(dump, output)
+
+def default_output():
+    return os.environ.get(ENV_OUTPUT) or os.path.join(os.path.expanduser("~"), ".salary_calendar", f"stats-{os.getpid()}.json")
+
+def enable_from_env():
+    if os.environ.get(ENV_ENABLE) != "1" and os.environ.get(ENV_PROFILE) != "1": return False
+    enable(profile=os.environ.get(ENV_PROFILE) == "1", output=default_output())
+    return True
+
+def add_counters(name, source):
+    # source() -> dict счётчиков (например, попадания кэша смен); попадает в snapshot и JSON-отчёт
+    with _lock:
+        _counters[name] = source
+
+def reset():
+    with _lock:
+        _queries.clear()
+        _phases.clear()
+
+def _rows(table):
+    rows = [{"name": key, "count": s[0], "total_ms": round(s[1] * 1000, 3),
+             "avg_ms": round(s[1] * 1000 / s[0], 3) if s[0] else None, "max_ms": round(s[2] * 1000, 3)}
+            for key, s in table.items()]
+    return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+class _ProfileSnapshot:
+    # текущие данные профайлера без disable(): disable() из чужого потока выключил бы профилирование не там
+    def __init__(self, profiler):
+        profiler.snapshot_stats()
+        self.stats = dict(profiler.stats)
+
+    def create_stats(self):
+        pass
+
+def _profile_stats():
+    import pstats
+    with _lock:
+        profilers = [p for _name, p in _profilers]
+    return pstats.Stats(*(_ProfileSnapshot(p) for p in profilers))
+
+def _profile_top(limit=30):
+    stats = _profile_stats()
+    rows = []
+    for (filename, line, func), (_cc, calls, tottime, cumtime, _callers) in stats.stats.items():
+        rows.append({"function": f"{os.path.basename(filename)}:{line}({func})", "calls": calls,
+                     "tottime_ms": round(tottime * 1000, 3), "cumtime_ms": round(cumtime * 1000, 3)})
+    return sorted(rows, key=lambda r: r["cumtime_ms"], reverse=True)[:limit]
+
+def snapshot():
+    with _lock:
+        queries, phases = _rows(_queries), _rows(_phases)
+    with _lock:
+        sources = list(_counters.items())
+    counters = {name: source() for name, source in sources}
+    result = {"enabled": enabled, "uptime_s": round(time.time() - _started, 1), "queries": queries, "phases": phases,
+              "counters": {name: value for name, value in counters.items() if value is not None}}
+    if _profilers:
+        result["profile_threads"] = [name for name, _p in _profilers]
+        result["profile"] = _profile_top()
+    return result
+
+def dump(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    data = snapshot()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    if _profilers:
+        _profile_stats().dump_stats(os.path.splitext(path)[0] + ".prof")
+    return path
@@ -1,15 +1,20 @@
 #!/usr/bin/env python3
 import tkinter as tk
-from tkinter import ttk, messagebox, colorchooser
-from datetime import date, datetime, timedelta
+from tkinter import ttk, messagebox
+from datetime import date, datetime
 from .utils import center_window
 import calendar
 from decimal import Decimal
 import os
-import sqlite3
 
 from .constants import cents_to_money, format_minutes_hhmm
-from . import database, calculations, events, widgets
+from . import database, calculations, widgets, month_view, payroll, holidays, instrument
+from .repository import ShiftRepository, load_month_data
+from .ledger import PeriodLedger
+from .replica import LocalReplica
+from .worker import DbWorker
+from .session import ShiftSession, journal_path, kept_from_row
+from .settings import Settings
 from .profile_manager import ProfileManager, parse_hhmm_to_min, format_min_to_hhmm
 
 def center_window(window, width=None, height=None):
@@ -25,6 +30,8 @@ def center_window(window, width=None, height=None):
     window.geometry(f"{width}x{height}+{x}+{y}")
 
 class CalendarApp:
+    tooltip_delay_ms = 350
+
     def __init__(self, master, profile_name, manager: ProfileManager):
         self.master = master
         self.master.title(f"Salary Calendar (Рабочий календарь) - {profile_name}")
@@ -33,23 +40,140 @@ class CalendarApp:
         self.master.resizable(False, False)
         self.profile_name = profile_name
         self.manager = manager
-        self.db_path = os.path.join(manager.profiles_dir, f"{profile_name}.db")
-        self.conn = sqlite3.connect(self.db_path)
+        self.db_path = manager.db_path(profile_name)
+        self.replica = None
+        self.ready = False
+        self._summary_dirty = False
+        self.conn = self._connect()
         if not self._db_exists():
             database.init_db(self.conn)
-            self.manager.save_default_colors(self.conn)
-        self.base_amount = Decimal(self.manager.load_setting(self.conn, 'salary', '90610.5'))
-        self.lunch_min = int(self.manager.load_setting(self.conn, 'lunch_min', '60'))
-        self.required_minutes = 480 + self.lunch_min
-        self.colors = self.manager.load_colors(self.conn)
-        self.holidays_set, self.holidays_names = self._load_manual_holidays(range(2024, 2028))
+            Settings.defaults().save(self.conn)
+            self._committed()
+        elif self.conn.execute("PRAGMA user_version").fetchone()[0] < len(database.MIGRATIONS):
+            database.migrate(self.conn)
+            self._committed()
+        self.ledger = None
+        self.repo = None
+        self.settings = Settings.load(self.conn)
+        self.holidays_set, self.holidays_names = set(), {}
+        self.prod_cal = None
         self.today = date.today()
         self.cur_year = self.today.year
         self.cur_month = self.today.month
         self.tooltip = None
+        self._tooltip_after = None
+        self.year_view = None
+        self.session = None
+        self._session_tick = None
+        self.month_shifts = {}
+        self._applied = {}
+        self._loading = None
         self._build_ui()
+        # После старта все запросы к БД идут через поток worker, Tk-поток на I/O не блокируется
+        self.worker = DbWorker(self.master, on_error=self._on_db_error)
+        instrument.add_counters("shift_cache", lambda: self.repo.stats() if self.repo else None)
+        self.master.bind("<Destroy>", self._on_destroy, add="+")
+        # Окно показывается с пустой сеткой; журнал итогов, праздники и первая отрисовка — после него
+        self.master.after_idle(self._finish_startup)
+
+    # оклад, обед и цвета читаются из self.settings; правка подменяет объект целиком
+    @property
+    def base_amount(self):
+        return self.settings.salary
+
+    @property
+    def lunch_min(self):
+        return self.settings.lunch_min
+
+    @property
+    def required_minutes(self):
+        return self.settings.required_minutes
+
+    @property
+    def colors(self):
+        return self.settings.colors
+
+    def _finish_startup(self):
+        self.holidays_set, self.holidays_names = self._load_manual_holidays(holidays.DEFAULT_YEARS)
+        self.prod_cal = calculations.ProductionCalendar(self.holidays_set)
+        self._show_loading()
+        self.worker.submit(self._open_repository, callback=self._on_repository_ready)
+
+    def _open_repository(self):
+        # поток worker
+        self.ledger = PeriodLedger.build(self.conn)
+        return ShiftRepository(self.conn, ledger=self.ledger)
+
+    def _on_repository_ready(self, repo):
+        self.repo = repo
+        self.ready = True
         self._draw_calendar()
         self._start_timer()
+        self._restore_session()
+        if self.replica:
+            self._check_replica()
+
+    def _connect(self):
+        # соединение открывается в Tk-потоке, а используется потоком worker
+        if not self.manager.local_replica:
+            return database.connect(self.db_path, check_same_thread=False)
+        self.replica = LocalReplica(self.db_path, self.manager.replica_dir)
+        return self.replica.connect(check_same_thread=False)
+
+    def _on_db_error(self, error):
+        self._hide_loading()
+        messagebox.showerror("Ошибка БД", f"{type(error).__name__}: {error}")
+
+    def _show_loading(self):
+        # индикатор появляется, только если ответ задерживается
+        if self._loading is None:
+            self._loading = self.master.after(150, self._loading_visible)
+
+    def _loading_visible(self):
+        self._loading = True
+        self.master.config(cursor="watch")
+        self._configure(self.lbl_month, text=f"{calendar.month_name[self.cur_month]} {self.cur_year} — загрузка…")
+
+    def _hide_loading(self):
+        if self._loading is None: return
+        if self._loading is True:
+            self.master.config(cursor="")
+        else:
+            self.master.after_cancel(self._loading)
+        self._loading = None
+
+    def _committed(self):
+        if self.replica:
+            self.replica.schedule_push()
+        self._summary_dirty = True
+
+    def _update_summary(self):
+        # один раз при закрытии, после остановки worker: сводка профиля в реестре (последняя смена, итог месяца).
+        # Реестр лежит на шаре, запись после каждого сохранения удваивала бы сетевые fsync.
+        today = date.today()
+        last_day = self.conn.execute("SELECT MAX(day) FROM shifts").fetchone()[0]
+        total = self.ledger.month(today.year, today.month)[0]
+        self.manager.registry.update_summary(self.profile_name, last_day, f"{today.year:04d}-{today.month:02d}", total)
+
+    def _check_replica(self):
+        if self.replica.conflict or self.replica.conflict_copy:
+            messagebox.showwarning("Конфликт синхронизации",
+                                   f"Файл профиля на сервере изменён другим пользователем.\nЛокальные изменения сохранены в {self.replica.conflict_copy}")
+            self.replica.conflict_copy = None
+        if not self.replica.conflict:
+            self.master.after(5000, self._check_replica)
+
+    def _on_destroy(self, event):
+        if event.widget is not self.master: return
+        self.worker.close()
+        if self._summary_dirty and self.ready:
+            try:
+                self._update_summary()
+            except (database.sqlite3.Error, OSError):
+                pass  # сводка в реестре необязательна, недоступная шара не мешает закрытию
+        self.conn.close()
+        if self.replica:
+            self.replica.close()
 
     def _db_exists(self):
         cur = self.conn.cursor()
@@ -58,31 +182,7 @@ class CalendarApp:
         return bool(tables)
 
     def _load_manual_holidays(self, years):
-        hset = set()
-        names = {}
-        for y in years:
-            for mday in range(1, 10):
-                from datetime import date as _d
-                hset.add(_d(y, 1, mday))
-                names[_d(y, 1, mday)] = "Новогодние каникулы"
-            from datetime import date as _d
-            names[_d(y, 1, 7)] = "Рождество"
-            hset.add(_d(y, 1, 7))
-            names[_d(y, 2, 23)] = "День защитника Отечества"
-            hset.add(_d(y, 2, 23))
-            names[_d(y, 3, 8)] = "Международный женский день"
-            hset.add(_d(y, 3, 8))
-            names[_d(y, 5, 1)] = "Праздник труда"
-            hset.add(_d(y, 5, 1))
-            names[_d(y, 5, 9)] = "День Победы"
-            hset.add(_d(y, 5, 9))
-            names[_d(y, 6, 12)] = "День России"
-            hset.add(_d(y, 6, 12))
-            names[_d(y, 11, 4)] = "День единства"
-            hset.add(_d(y, 11, 4))
-            names[_d(y, 12, 31)] = "Новый год"
-            hset.add(_d(y, 12, 31))
-        return hset, names
+        return holidays.load_manual_holidays(years)
 
     def _build_ui(self):
         top = ttk.Frame(self.master)
@@ -97,6 +197,7 @@ class CalendarApp:
         self.btn_settings = ttk.Button(top, text="⚙", width=3, command=self._on_settings)
         self.btn_settings.pack(side="right", padx=2)
         self.create_tooltip(self.btn_settings, "Настройки Вида")
+        self.btn_settings.bind("<Shift-Button-1>", self._on_debug_panel)
 
         self.btn_profile = ttk.Button(top, text="👤", width=3, command=self._on_profile)
         self.btn_profile.pack(side="right", padx=2)
@@ -128,6 +229,7 @@ class CalendarApp:
         self.cmb_month.current(self.cur_month - 1)
         self.cmb_month.bind("<<ComboboxSelected>>", self._on_combo)
         self.cmb_month.pack(side="left", padx=6)
+        ttk.Button(nav, text="Обзор года", command=self._open_year_view).pack(side="left", padx=6)
 
         self.cal_frame = ttk.Frame(self.master)
         self.cal_frame.pack(padx=8, pady=6, fill="both", expand=True)
@@ -155,19 +257,7 @@ class CalendarApp:
                                                                                                          padx=15)
 
     def create_tooltip(self, widget, text):
-        def enter(event):
-            x = widget.winfo_rootx() + 25
-            y = widget.winfo_rooty() + 25
-            self.tw = tk.Toplevel(widget)
-            self.tw.wm_overrideredirect(True)
-            self.tw.wm_geometry(f"+{x}+{y}")
-            label = tk.Label(self.tw, text=text, background="yellow", relief="solid", borderwidth=1)
-            label.pack()
-        def leave(event):
-            if hasattr(self, 'tw'):
-                self.tw.destroy()
-        widget.bind("<Enter>", enter)
-        widget.bind("<Leave>", leave)
+        return widgets.HintTooltip(widget, text)
 
     def _on_profile(self):
         popup = tk.Menu(self.master, tearoff=0)
@@ -212,7 +302,7 @@ class CalendarApp:
         ent_repeat.grid(row=4, column=1, pady=10)
         def on_save():
             new_name = ent_name.get().strip()
-            profiles = self.manager.get_profiles()
+            profiles = self.manager.get_profiles(fresh=True)
             if new_name != current_name and new_name in profiles:
                 messagebox.showerror("Ошибка", "Имя существует")
                 return
@@ -235,32 +325,70 @@ class CalendarApp:
             if pin and not pin.isdigit():
                 messagebox.showerror("Ошибка", "Пин цифры")
                 return
-            self.manager.save_setting(self.conn, 'salary', str(salary))
-            self.manager.save_setting(self.conn, 'lunch_min', str(lunch_min))
-            self.base_amount = salary
-            self.lunch_min = lunch_min
-            self.required_minutes = 480 + lunch_min
-            if pin:
-                self.manager.pins[new_name] = pin
-            if new_name != current_name:
-                old_db = self.db_path
-                new_db = os.path.join(self.manager.profiles_dir, f"{new_name}.db")
-                self.conn.close()
-                os.rename(old_db, new_db)
-                self.db_path = new_db
-                self.conn = sqlite3.connect(new_db)
-                if current_name in self.manager.pins:
-                    self.manager.pins[new_name] = self.manager.pins.pop(current_name)
-                self.profile_name = new_name
-                self.master.title(f"Salary Calendar (Рабочий календарь) - {new_name}")
-            self.manager.save_pins()
-            messagebox.showinfo("Успех", "Данные обновлены")
-            dlg.destroy()
-            self._draw_calendar()
+            recompute = (salary != current_salary or lunch_min != current_lunch) and messagebox.askyesno(
+                "Пересчёт", "Пересчитать сохранённые смены по новой зарплате и времени обеда?\n"
+                            "Распределённые переработки и доплаты по этим дням будут сброшены.")
+            new_db = os.path.join(self.manager.profiles_dir, f"{new_name}.db") if new_name != current_name else None
+            if new_db and os.path.exists(new_db):
+                messagebox.showerror("Ошибка", "Имя существует")
+                return
+            settings = self.settings.copy().update({'salary': salary, 'lunch_min': lunch_min})
+            def saved(_result):
+                if new_db:
+                    self.profile_name = new_name
+                    self.master.title(f"Salary Calendar (Рабочий календарь) - {new_name}")
+                messagebox.showinfo("Успех", "Данные обновлены")
+                dlg.destroy()
+            def settings_saved(_result):
+                # настройки и пересчёт уже в БД: применяются, даже если переименование дальше не удастся
+                self.settings = settings
+                self._committed()
+                self._draw_calendar()
+                self.worker.submit(self._save_profile, pin, new_name, new_db, callback=saved)
+            self.worker.submit(self._save_settings, settings, recompute, callback=settings_saved)
         ttk.Button(frame, text="Сохранить", command=on_save).grid(row=5, column=0, columnspan=2, pady=20)
         dlg.grab_set()
         self.master.wait_window(dlg)
 
+    def _save_settings(self, settings, recompute):
+        # поток worker: настройки и пересчёт смен одной транзакцией
+        with database.transaction(self.conn):
+            settings.save(self.conn)
+            if recompute:
+                payroll.recompute_shifts(self.conn, self.prod_cal, settings.salary, settings.lunch_min)
+        if recompute:
+            self.repo.reload()
+
+    def _save_profile(self, pin, new_name, new_db):
+        # поток worker: переименование профиля и пин, после того как настройки записаны
+        if new_db:
+            # os.rename на POSIX молча заменит чужой файл профиля, которого нет в реестре
+            if os.path.exists(new_db):
+                raise ValueError(f"Профиль «{new_name}» уже существует")
+            self.conn.close()
+            if self.replica:
+                self.replica.close()
+            old_db = self.db_path
+            try:
+                os.rename(old_db, new_db)
+            except OSError:
+                # файл занят или цель уже есть — остаёмся на старой БД с живым соединением
+                self.conn = self._connect()
+                self.repo = ShiftRepository(self.conn, ledger=self.ledger)
+                raise
+            if not self.manager.rename_profile(self.profile_name, new_name, new_db):
+                os.rename(new_db, old_db)
+                self.conn = self._connect()
+                self.repo = ShiftRepository(self.conn, ledger=self.ledger)
+                raise ValueError(f"Профиль «{new_name}» уже существует")
+            self.db_path = new_db
+            if self.session:
+                self.session.relocate(journal_path(new_db))
+            self.conn = self._connect()
+            self.repo = ShiftRepository(self.conn, ledger=self.ledger)
+        if pin:
+            self.manager.set_pin(new_name, pin)
+
     def _on_settings(self):
         dlg = tk.Toplevel(self.master)
         dlg.title("Настройки Вида")
@@ -291,6 +419,7 @@ class CalendarApp:
             ent.grid(row=row, column=1, padx=5, pady=5)
             entries[k] = ent
             def choose(k=k, ent=ent):
+                from tkinter import colorchooser
                 color = colorchooser.askcolor(color=colors[k])[1]
                 if color:
                     ent.delete(0, tk.END)
@@ -298,17 +427,26 @@ class CalendarApp:
             ttk.Button(dlg, text="Выбрать", command=choose).grid(row=row, column=2, padx=5, pady=5)
             row += 1
         def on_save():
+            changed = {}
             for k, ent in entries.items():
                 color = ent.get().strip()
                 if color and len(color) == 7 and color.startswith('#'):
-                    self.manager.save_setting(self.conn, f"color_{k}", color)
-            self.colors = self.manager.load_colors(self.conn)
-            self._draw_calendar()
-            dlg.destroy()
+                    changed[f"color_{k}"] = color
+            settings = self.settings.copy().update(changed)
+            def saved(_result):
+                self._committed()
+                self.settings = settings
+                self._draw_calendar()
+                dlg.destroy()
+            self.worker.submit(settings.save, self.conn, callback=saved)
         ttk.Button(dlg, text="Сохранить", command=on_save).grid(row=row, column=0, columnspan=3, pady=10)
         dlg.grab_set()
         self.master.wait_window(dlg)
 
+    def _on_debug_panel(self, event=None):
+        widgets.DebugPanel(self.master, instrument.snapshot, instrument.reset, lambda: instrument.dump(instrument.default_output()))
+        return "break"
+
     def _logout(self):
         self.master.destroy()
 
@@ -341,14 +479,18 @@ class CalendarApp:
 
     def _create_calendar_grid(self):
         headers = ["Неделя", "Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
+        self.header_labels = []
+        self.week_labels = {}
         for c, txt in enumerate(headers):
             lbl = tk.Label(self.cal_frame, text=txt, bg=self.colors["header_bg"], relief="ridge", anchor="center")
             lbl.grid(row=0, column=c, sticky="nsew")
+            self.header_labels.append(lbl)
         for r in range(1, 7):
             for c in range(8):
                 if c == 0:
                     lbl = tk.Label(self.cal_frame, text="", bg=self.colors["header_bg"], relief="ridge", anchor="center")
                     lbl.grid(row=r, column=c, sticky="nsew")
+                    self.week_labels[r] = lbl
                 else:
                     btn = tk.Button(self.cal_frame, text="", width=10, height=5, relief="flat", command=lambda row=r, col=c: self._on_day_click(self.day_buttons[(row, col)]["date"]))
                     btn.grid(row=r, column=c, sticky="nsew")
@@ -360,55 +502,93 @@ class CalendarApp:
         for i in range(7):
             self.cal_frame.grid_rowconfigure(i, weight=1)
 
+    def _configure(self, widget, **options):
+        # Вызывает config только для реально изменившихся опций виджета.
+        applied = self._applied.setdefault(str(widget), {})
+        changed = {k: v for k, v in options.items() if v is not None and applied.get(k) != v}
+        if changed:
+            widget.config(**changed)
+            applied.update(changed)
+
     def _draw_calendar(self):
-        self.lbl_month.config(text=f"{calendar.month_name[self.cur_month]} {self.cur_year}")
-        self.spin_year.delete(0, "end")
-        self.spin_year.insert(0, str(self.cur_year))
-        self.cmb_month.current(self.cur_month - 1)
-        cal = calendar.Calendar()
-        weeks = cal.monthdatescalendar(self.cur_year, self.cur_month)
-        for r in range(1, 7):
-            weekly_total_min = 0
-            for c in range(1, 8):
-                if r-1 >= len(weeks):
-                    self.day_buttons[(r,c)]["btn"].config(text="", state="disabled")
-                    continue
-                d = weeks[r-1][c-1]
-                self.day_buttons[(r,c)]["date"] = d
-                color = self._color_for_day(d)
-                self.day_buttons[(r,c)]["btn"].config(text=str(d.day), state="normal", bg=color)
-                shift = database.load_shift(self.conn, d.isoformat())
-                if shift:
-                    weekly_total_min += shift[2] or 0
-            week_lbl = self.cal_frame.grid_slaves(row=r, column=0)[0]
-            week_color = self.colors["weekly_overtime"] if weekly_total_min > 5 * self.required_minutes else self.colors["weekly_undertime"] if weekly_total_min < 5 * self.required_minutes else self.colors["header_bg"]
-            week_lbl.config(background=week_color, text=f"Нед {r}: {format_minutes_hhmm(weekly_total_min)}")
-        self._update_info_labels()
-
-    def _color_for_day(self, d):
-        if d.month != self.cur_month: return self.colors["other_month"]
-        if d == self.today: return self.colors["today"]
-        shift = database.load_shift(self.conn, d.isoformat())
-        is_weekend = d.weekday() >= 5 or d in self.holidays_set
-        if shift:
-            if shift[3] > 0: return self.colors["undertime"]
-            return self.colors["weekend"] if is_weekend else self.colors["weekday_ok"]
-        if d < self.today: return self.colors["past_no_data"]
-        return self.colors["weekend"] if is_weekend else self.colors["weekday_ok"]
+        if not self.ready: return
+        if self.spin_year.get() != str(self.cur_year):
+            self.spin_year.delete(0, "end")
+            self.spin_year.insert(0, str(self.cur_year))
+        if self.cmb_month.current() != self.cur_month - 1:
+            self.cmb_month.current(self.cur_month - 1)
+        self._show_loading()
+        self.worker.submit(self._load_month, self.cur_year, self.cur_month, callback=self._apply_month, key="month")
+
+    def _load_month(self, year, month):
+        # поток worker: смены видимых недель и итоги из журнала за один заход
+        with instrument.phase("load_month"):
+            return (year, month) + load_month_data(self.repo, self.ledger, year, month)
+
+    def _apply_month(self, result):
+        with instrument.phase("draw"):
+            year, month, self.month_shifts, weeks, totals = result
+            self._hide_loading()
+            self._configure(self.lbl_month, text=f"{calendar.month_name[month]} {year}")
+            with instrument.phase("colors"):
+                cells, week_rows = month_view.build_month_view(year, month, self.today, self.month_shifts,
+                                                               self.holidays_set, self.colors, self.required_minutes, weeks.get)
+            for lbl in self.header_labels:
+                self._configure(lbl, bg=self.colors["header_bg"])
+            for rc, (d, text, state, color) in cells.items():
+                self.day_buttons[rc]["date"] = d
+                self._configure(self.day_buttons[rc]["btn"], text=text, state=state, bg=color)
+            for r, (text, color, _total) in week_rows.items():
+                self._configure(self.week_labels[r], background=color, text=text)
+            self._update_info_labels(year, month, totals)
+
+    def _open_year_view(self):
+        if not self.ready: return
+        if self.year_view is None or not self.year_view.winfo_exists():
+            self.year_view = widgets.YearView(self.master, self.cur_year, self._load_year_view, self._on_year_view_day)
+        self.year_view.lift()
+        self._load_year_view(self.cur_year)
+
+    def _load_year_view(self, year):
+        # одна выборка смен за год в потоке worker, раскраска — по holidays_set
+        self.worker.submit(database.load_shifts_between, self.conn, f"{year:04d}-01-01", f"{year:04d}-12-31",
+                           callback=lambda shifts: self._apply_year_view(year, shifts), key="year")
+
+    def _apply_year_view(self, year, shifts):
+        if self.year_view is None or not self.year_view.winfo_exists(): return
+        with instrument.phase("year_view"):
+            months, totals = month_view.build_year_view(year, self.today, shifts, self.holidays_set, self.colors)
+            captions = {m: f"{cents_to_money(pay)} руб · {format_minutes_hhmm(worked)}" for m, (pay, worked) in totals.items()}
+            self.year_view.show_year(year, months, captions, self.today)
+
+    def _on_year_view_day(self, d):
+        self.cur_year, self.cur_month = d.year, d.month
+        self._draw_calendar()
 
     def _show_tooltip(self, event, rc):
-        d = self.day_buttons[rc]["date"]
-        if not d: return
-        shift = database.load_shift(self.conn, d.isoformat())
-        lines = self._tooltip_lines_for_day(d, shift)
-        if not lines: return
-        self.tooltip = widgets.Tooltip(self.master, lines, lambda: self._on_day_click(d))
-        x, y = event.x_root + 10, event.y_root + 10
-        self.tooltip.show_at(x, y)
+        # подсказка появляется после короткой задержки; при проходе мышью по сетке ничего не строится
+        self._cancel_tooltip()
+        self._tooltip_after = self.master.after(self.tooltip_delay_ms, self._tooltip_due, rc, event.x_root + 10, event.y_root + 10)
+
+    def _tooltip_due(self, rc, x, y):
+        with instrument.phase("tooltip"):
+            self._tooltip_after = None
+            d = self.day_buttons[rc]["date"]
+            if not d: return
+            lines = self._tooltip_lines_for_day(d, self.month_shifts.get(d.isoformat()))
+            if not lines: return
+            if self.tooltip is None:
+                self.tooltip = widgets.Tooltip(self.master)
+            self.tooltip.show(lines, lambda: self._on_day_click(d), x, y)
+
+    def _cancel_tooltip(self):
+        if self._tooltip_after is not None:
+            self.master.after_cancel(self._tooltip_after)
+            self._tooltip_after = None
 
     def _hide_tooltip(self):
-        if self.tooltip: self.tooltip.close()
-        self.tooltip = None
+        self._cancel_tooltip()
+        if self.tooltip: self.tooltip.hide()
 
     def _tooltip_lines_for_day(self, d, shift):
         lines = [d.strftime("%d %B %Y")]
@@ -435,74 +615,145 @@ class CalendarApp:
         return lines
 
     def _on_day_click(self, d):
-        if self.tooltip: self.tooltip.close()
-        existing = database.load_shift(self.conn, d.isoformat()) or (None, None, None, None, None, None, None, None)
+        if not d or not self.ready: return
+        self._hide_tooltip()
+        existing = self.month_shifts.get(d.isoformat()) or (None, None, None, None, None, None, None, None)
         existing_dict = {"activation": existing[0], "end": existing[1], "notes": existing[7]}
-        dlg = widgets.EditShiftDialog(self.master, d, existing_dict, self.conn, self.lunch_min)
+        dlg = widgets.EditShiftDialog(self.master, d, existing_dict, self.lunch_min)
         self.master.wait_window(dlg)
         if not dlg.result: return
         if dlg.result.get("deleted"):
-            self._draw_calendar()
+            self.worker.submit(self._repo_call, "delete_shift", d.isoformat(), callback=self._shift_saved)
             return
         activation = dlg.result["activation"]
         end = dlg.result["end"]
         notes = dlg.result["notes"]
-        duration_min = self._calculate_duration(activation, end)
-        hourly = calculations.hourly_rate_for_month(d.year, d.month, self.holidays_set, self.base_amount)
-        is_weekend = d.weekday() >= 5 or d in self.holidays_set
-        if not is_weekend:
-            undertime_min = max(0, self.required_minutes - duration_min)
-            overtime_min = max(0, duration_min - self.required_minutes)
-            day_pay_cents = calculations.day_base_pay(hourly)
-            overtime_pay_cents = calculations.calc_overtime_pay_minutes(overtime_min, hourly)
-        else:
-            undertime_min = 0
-            overtime_min = 0
-            day_pay_cents = calculations.weekend_pay_for_duration(duration_min, hourly, self.lunch_min)
-            overtime_pay_cents = 0
-        database.save_shift(self.conn, d.isoformat(), activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes)
+        duration_min = calculations.shift_duration_min(activation, end)
+        hourly = self.prod_cal.hourly_rate(d.year, d.month, self.base_amount)
+        is_weekend = self.prod_cal.is_day_off(d)
+        undertime_min, overtime_min, day_pay_cents, overtime_pay_cents = calculations.compute_shift(
+            duration_min, hourly, self.required_minutes, self.lunch_min, is_weekend)
+        self.worker.submit(self._repo_call, "save_shift", d.isoformat(), activation, end, duration_min, undertime_min, overtime_min,
+                           day_pay_cents, overtime_pay_cents, notes, callback=self._shift_saved)
+
+    def _repo_call(self, name, *args):
+        # поток worker; репозиторий берётся в момент выполнения (после переименования профиля он новый)
+        return getattr(self.repo, name)(*args)
+
+    def _shift_saved(self, _result):
+        self._committed()
         self._draw_calendar()
 
-    def _calculate_duration(self, act, end):
-        if not act or not end: return 0
-        try:
-            act_dt = datetime.strptime(act, "%H:%M")
-            end_dt = datetime.strptime(end, "%H:%M")
-            if end_dt < act_dt: end_dt += timedelta(days=1)
-            return int((end_dt - act_dt).total_seconds() / 60)
-        except:
-            return 0
-
-    def _update_info_labels(self):
-        first_start = date(self.cur_year, self.cur_month, 1).isoformat()
-        first_end = date(self.cur_year, self.cur_month, 15).isoformat()
-        second_start = date(self.cur_year, self.cur_month, 16).isoformat()
-        last_day = calendar.monthrange(self.cur_year, self.cur_month)[1]
-        second_end = date(self.cur_year, self.cur_month, last_day).isoformat()
-        first_shifts = database.list_shifts_between(self.conn, first_start, first_end)
-        second_shifts = database.list_shifts_between(self.conn, second_start, second_end)
-        salary_first = sum(cents_to_money(s[5] + s[6]) for s in first_shifts if s[5] or s[6])
-        salary_second = sum(cents_to_money(s[5] + s[6]) for s in second_shifts if s[5] or s[6])
-        total = salary_first + salary_second
-        pending = database.find_pending_overtimes(self.conn, self.cur_year, self.cur_month)
-        pending_ot = sum(row[1] or 0 for row in pending)
-        self.lbl_salary_first.config(text=f"1-15: {salary_first:.2f} руб")
-        self.lbl_salary_second.config(text=f"16-{last_day}: {salary_second:.2f} руб")
-        self.lbl_total_salary.config(text=f"Итого: {total:.2f} руб")
-        self.lbl_pending_overtime.config(text=f"Нераспределенная переработка: {format_minutes_hhmm(pending_ot)}")
+    def _update_info_labels(self, year, month, totals):
+        with instrument.phase("info_labels"):
+            last_day = calendar.monthrange(year, month)[1]
+            salary_first = cents_to_money(totals[0])
+            salary_second = cents_to_money(totals[1])
+            total = salary_first + salary_second
+            pending_ot = totals[2]
+            self._configure(self.lbl_salary_first, text=f"1-15: {salary_first:.2f} руб")
+            self._configure(self.lbl_salary_second, text=f"16-{last_day}: {salary_second:.2f} руб")
+            self._configure(self.lbl_total_salary, text=f"Итого: {total:.2f} руб")
+            self._configure(self.lbl_pending_overtime, text=f"Нераспределенная переработка: {format_minutes_hhmm(pending_ot)}")
 
     def _start_timer(self):
+        # Ежеминутный тик: перерисовка нужна только при смене дня,
+        # правки и смена цветов перерисовывают сетку сами.
         self.master.after(60000, self._start_timer)
-        self._draw_calendar()
+        today = date.today()
+        if today != self.today:
+            self.today = today
+            self._draw_calendar()
 
     def _start_shift_today(self):
-        messagebox.showinfo("Информация", "Функция 'Начать смену' пока в разработке")
+        if not self.ready: return
+        if self.session:
+            messagebox.showinfo("Смена", f"Смена уже идёт с {self.session.activation}")
+            return
+        now = datetime.now()
+        today = now.date()
+        # ставка и норма фиксируются на всю смену, дальше тикер считает только по ним
+        self.session = ShiftSession(now, self.prod_cal.hourly_rate(today.year, today.month, self.base_amount),
+                                    self.required_minutes, self.lunch_min, self.prod_cal.is_day_off(today),
+                                    journal_path(self.db_path))
+        self._tick_session()
+        self.worker.submit(self._begin_session, self.session, callback=self._shift_saved, errback=self._session_failed)
+
+    def _begin_session(self, session):
+        # поток worker: строка начала смены и журнал
+        existing = self.repo.load_shift(session.day_iso)
+        if existing and existing[1]:
+            raise ValueError(f"Смена за {session.day_iso} уже записана ({existing[0]}–{existing[1]})")
+        self.repo.save_shift(*session.start_row(*kept_from_row(existing)))
+        session.save_journal()
+
+    def _session_failed(self, error):
+        self._stop_session()
+        if isinstance(error, ValueError):
+            messagebox.showwarning("Смена", str(error))
+        else:
+            self._on_db_error(error)
 
     def _end_shift_today(self):
-        messagebox.showinfo("Информация", "Функция 'Закончить смену' пока в разработке")
+        if not self.ready: return
+        if not self.session:
+            messagebox.showinfo("Смена", "Смена не начата")
+            return
+        session = self.session
+        self._stop_session()
+        self.worker.submit(self._finish_session, session, datetime.now(), callback=self._session_finished)
+
+    def _finish_session(self, session, now):
+        # поток worker: единственная запись итога, журнал удаляется только после неё
+        row = session.final_row(now, *kept_from_row(self.repo.load_shift(session.day_iso)))
+        self.repo.save_shift(*row)
+        session.discard_journal()
+        return row
+
+    def _session_finished(self, row):
+        self._configure(self.lbl_today_earn, text=f"{cents_to_money(row[6] + row[7]):.2f} руб")
+        self._shift_saved(row)
+
+    def _restore_session(self):
+        session = ShiftSession.restore(journal_path(self.db_path))
+        if session is None: return
+        self.session = session
+        self._tick_session()
+
+    def _tick_session(self):
+        # раз в секунду из памяти: ни запросов к БД, ни перерисовки календаря
+        self._session_tick = None
+        if not self.session: return
+        earned = cents_to_money(self.session.earned_cents(datetime.now()))
+        self._configure(self.lbl_expected_end, text=self.session.expected_end)
+        self._configure(self.lbl_today_earn, text=f"{earned:.2f} руб")
+        self._session_tick = self.master.after(1000, self._tick_session)
+
+    def _stop_session(self):
+        self.session = None
+        if self._session_tick is not None:
+            self.master.after_cancel(self._session_tick)
+            self._session_tick = None
+        self._configure(self.lbl_expected_end, text="—")
+        self._configure(self.lbl_today_earn, text="0.00 руб")
 
     def _distribute_overtime(self):
-        messagebox.showinfo("Информация", "Функция 'Обработать переработки' пока в разработке")
+        if not self.ready: return
+        year, month = self.cur_year, self.cur_month
+        self.worker.submit(self._repo_call, "distribute_pending_overtime", year, month,
+                           callback=lambda summary: self._overtime_distributed(year, month, summary))
+
+    def _overtime_distributed(self, year, month, summary):
+        if summary["changed_days"]:
+            self._committed()
+            self._draw_calendar()
+        messagebox.showinfo("Переработки", "\n".join([
+            f"{calendar.month_name[month]} {year}",
+            f"Распределено: {format_minutes_hhmm(summary['used_min'])}",
+            f"Дней-источников: {summary['sources']}",
+            f"Закрыто дней с недоработкой: {summary['targets']}",
+            f"Осталось нераспределенной переработки: {format_minutes_hhmm(summary['remaining_min'])}",
+        ]))
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
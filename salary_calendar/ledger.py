@@ -0,0 +1,77 @@
+from datetime import date
+from .database import statement_cursor
+
+def contribution(row):
+    # (оплата в копейках, отработанные минуты, нераспределённая переработка) одной смены;
+    # row в формате database.load_shift
+    if not row: return (0, 0, 0)
+    overtime = row[4] or 0
+    return ((row[5] or 0) + (row[6] or 0), row[2] or 0, overtime if overtime > 0 and not row[6] else 0)
+
+def period_keys(day_iso):
+    d = date.fromisoformat(day_iso)
+    iso = d.isocalendar()
+    return ("half", d.year, d.month, 1 if d.day <= 15 else 2), ("week", iso[0], iso[1]), ("month", d.year, d.month)
+
+class PeriodLedger:
+    # Итоги по половинам месяца, ISO-неделям и месяцам. Строится одним проходом по shifts,
+    # дальше обновляется ShiftRepository при каждой записи, так что инфо-панель и подписи недель
+    # не обращаются к БД. verify() пересобирает итоги с нуля и сравнивает.
+    def __init__(self):
+        self.days = {}
+        self.totals = {}
+
+    @classmethod
+    def build(cls, conn):
+        ledger = cls()
+        ledger.rebuild(conn)
+        return ledger
+
+    def rebuild(self, conn):
+        self.days = {}
+        self.totals = {}
+        for day_iso, row in _scan(conn):
+            self.apply(day_iso, row)
+
+    def apply(self, day_iso, row):
+        new = contribution(row)
+        old = self.days.pop(day_iso, (0, 0, 0))
+        if new != (0, 0, 0):
+            self.days[day_iso] = new
+        if new == old: return
+        for key in period_keys(day_iso):
+            t = self.totals.get(key, (0, 0, 0))
+            self.totals[key] = (t[0] - old[0] + new[0], t[1] - old[1] + new[1], t[2] - old[2] + new[2])
+
+    def refresh(self, conn, days):
+        # перечитывает указанные дни после изменений в events
+        days = sorted(set(days))
+        if not days: return
+        cur = statement_cursor(conn, "ledger_refresh")
+        cur.execute("SELECT day, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes FROM shifts WHERE day BETWEEN ? AND ?", (days[0], days[-1]))
+        rows = {r[0]: r[1:] for r in cur.fetchall()}
+        for day_iso in days:
+            self.apply(day_iso, rows.get(day_iso))
+
+    def half_month(self, year, month, half):
+        return self.totals.get(("half", year, month, half), (0, 0, 0))
+
+    def week(self, iso_year, iso_week):
+        return self.totals.get(("week", iso_year, iso_week), (0, 0, 0))
+
+    def month(self, year, month):
+        return self.totals.get(("month", year, month), (0, 0, 0))
+
+    def verify(self, conn):
+        # [(ключ периода, итог в журнале, итог по данным БД)] для всех расхождений
+        fresh = PeriodLedger.build(conn)
+        keys = set(self.totals) | set(fresh.totals)
+        empty = (0, 0, 0)
+        return sorted((k, self.totals.get(k, empty), fresh.totals.get(k, empty))
+                      for k in keys if self.totals.get(k, empty) != fresh.totals.get(k, empty))
+
+def _scan(conn):
+    cur = statement_cursor(conn, "ledger_scan")
+    cur.execute("SELECT day, NULL, NULL, duration_min, NULL, overtime_min, day_pay_cents, overtime_pay_cents, NULL FROM shifts")
+    for r in cur.fetchall():
+        yield r[0], r[1:]
@@ -0,0 +1,79 @@
+import calendar
+from datetime import date
+from .constants import format_minutes_hhmm
+
+def visible_weeks(year, month):
+    return calendar.Calendar().monthdatescalendar(year, month)
+
+def visible_range(year, month):
+    weeks = visible_weeks(year, month)
+    return weeks[0][0].isoformat(), weeks[-1][-1].isoformat()
+
+def color_for_day(d, month, today, shift, holidays_set, colors):
+    if d.month != month: return colors["other_month"]
+    if d == today: return colors["today"]
+    is_weekend = d.weekday() >= 5 or d in holidays_set
+    if shift:
+        if (shift[3] or 0) > 0: return colors["undertime"]
+        return colors["weekend"] if is_weekend else colors["weekday_ok"]
+    if d < today: return colors["past_no_data"]
+    return colors["weekend"] if is_weekend else colors["weekday_ok"]
+
+def week_color(weekly_total_min, required_minutes, colors):
+    if weekly_total_min > 5 * required_minutes: return colors["weekly_overtime"]
+    if weekly_total_min < 5 * required_minutes: return colors["weekly_undertime"]
+    return colors["header_bg"]
+
+def build_month_view(year, month, today, shifts, holidays_set, colors, required_minutes, week_minutes=None):
+    # Чистое вычисление состояния сетки без Tk: ячейки (дата, текст, state, цвет) и подписи недель.
+    # week_minutes(понедельник) — готовый итог недели (PeriodLedger); без него итог суммируется по shifts.
+    weeks = visible_weeks(year, month)
+    cells = {}
+    week_rows = {}
+    for r in range(1, 7):
+        weekly_total_min = 0
+        for c in range(1, 8):
+            if r - 1 >= len(weeks):
+                cells[(r, c)] = (None, "", "disabled", None)
+                continue
+            d = weeks[r - 1][c - 1]
+            shift = shifts.get(d.isoformat())
+            cells[(r, c)] = (d, str(d.day), "normal", color_for_day(d, month, today, shift, holidays_set, colors))
+            if shift:
+                weekly_total_min += shift[2] or 0
+        if week_minutes and r - 1 < len(weeks):
+            weekly_total_min = week_minutes(weeks[r - 1][0])
+        week_rows[r] = (f"Нед {r}: {format_minutes_hhmm(weekly_total_min)}", week_color(weekly_total_min, required_minutes, colors), weekly_total_min)
+    return cells, week_rows
+
+def year_day_color(d, today, shift, holidays_set, colors):
+    # цвет дня в обзоре года: недоработка, переработка, выходной, отработан, нет данных, будущий
+    if shift:
+        if (shift[3] or 0) > 0: return colors["undertime"]
+        if (shift[4] or 0) > 0: return colors["gold"]
+    if d.weekday() >= 5 or d in holidays_set: return colors["weekend"]
+    if shift: return colors["weekday_ok"]
+    if d < today: return colors["past_no_data"]
+    return colors["future_current_month"]
+
+def build_year_view(year, today, shifts, holidays_set, colors):
+    # Обзор года без Tk: {месяц: [(дата, строка, столбец, цвет)]} и {месяц: (оплата в копейках, минуты)};
+    # shifts — смены года одной выборкой (database.load_shifts_between).
+    months = {}
+    totals = {}
+    cal = calendar.Calendar()
+    for m in range(1, 13):
+        cells = []
+        pay = worked = 0
+        for r, week in enumerate(cal.monthdayscalendar(year, m)):
+            for c, day in enumerate(week):
+                if not day: continue
+                d = date(year, m, day)
+                shift = shifts.get(d.isoformat())
+                if shift:
+                    pay += (shift[5] or 0) + (shift[6] or 0)
+                    worked += shift[2] or 0
+                cells.append((d, r, c, year_day_color(d, today, shift, holidays_set, colors)))
+        months[m] = cells
+        totals[m] = (pay, worked)
+    return months, totals
@@ -0,0 +1,80 @@
+from datetime import date
+from . import calculations
+from .database import statement_cursor, transaction, period_bounds
+
+def load_shift_columns(conn, start_iso, end_iso):
+    # Смены диапазона в виде столбцов; строки без длительности (созданные доплатой) не пересчитываются.
+    cur = statement_cursor(conn, "load_shift_columns")
+    cur.execute("""
+        SELECT day, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents
+        FROM shifts WHERE day >= ? AND day < ? AND duration_min IS NOT NULL ORDER BY day
+    """, (start_iso, end_iso))
+    rows = cur.fetchall()
+    names = ("day", "activation", "end", "duration_min", "undertime_min", "overtime_min", "day_pay_cents", "overtime_pay_cents")
+    if not rows:
+        return {name: [] for name in names}
+    return dict(zip(names, map(list, zip(*rows))))
+
+def recompute_columns(cols, prod_cal, base_amount, lunch_min, arithmetic="int"):
+    # Пакетный пересчёт по правилам calculations.compute_shift: ставка считается один раз на месяц,
+    # оплата — один раз на каждую пару (месяц, минуты), дальше значения раздаются по столбцам.
+    # arithmetic="int" — целочисленный путь в копейках, "decimal" — исходный путь через Decimal.
+    if arithmetic == "int":
+        hourly_rate = prod_cal.hourly_rate_cents
+        day_base_pay = calculations.day_base_pay_cents
+        overtime_pay = calculations.overtime_pay_cents
+        weekend_pay = calculations.weekend_pay_for_duration_cents
+    else:
+        hourly_rate = prod_cal.hourly_rate
+        day_base_pay = calculations.day_base_pay
+        overtime_pay = calculations.calc_overtime_pay_minutes
+        weekend_pay = calculations.weekend_pay_for_duration
+    required = 480 + lunch_min
+    times = {}
+    for t in set(cols["activation"]) | set(cols["end"]):
+        times[t] = calculations.time_to_min(t) if t else None
+    durations = []
+    for act, end in zip(cols["activation"], cols["end"]):
+        a, e = times[act], times[end]
+        if a is None or e is None:
+            durations.append(0)
+        else:
+            durations.append(e - a if e >= a else e - a + 1440)
+    months = [(int(d[:4]), int(d[5:7])) for d in cols["day"]]
+    rates = {m: hourly_rate(m[0], m[1], base_amount) for m in set(months)}
+    off = [prod_cal.is_day_off(date(m[0], m[1], int(d[8:10]))) for m, d in zip(months, cols["day"])]
+    base_pay = {m: day_base_pay(rate) for m, rate in rates.items()}
+    undertime = [0 if w else max(0, required - dur) for dur, w in zip(durations, off)]
+    overtime = [0 if w else max(0, dur - required) for dur, w in zip(durations, off)]
+    pay_memo = {}
+    day_pay = []
+    ot_pay = []
+    for m, dur, ot, w in zip(months, durations, overtime, off):
+        key = (m, dur if w else ot, w)
+        pay = pay_memo.get(key)
+        if pay is None:
+            if w:
+                pay = (weekend_pay(dur, rates[m], lunch_min), 0)
+            else:
+                pay = (base_pay[m], overtime_pay(ot, rates[m]))
+            pay_memo[key] = pay
+        day_pay.append(pay[0])
+        ot_pay.append(pay[1])
+    return {"day": cols["day"], "duration_min": durations, "undertime_min": undertime, "overtime_min": overtime,
+            "day_pay_cents": day_pay, "overtime_pay_cents": ot_pay}
+
+def recompute_shifts(conn, prod_cal, base_amount, lunch_min, year=None, month=None, arithmetic="int"):
+    # Пересчитывает сохранённые смены периода так же, как повторное сохранение дня в диалоге:
+    # распределённые недоработки и доплаты по этим дням сбрасываются. Возвращает число изменённых дней.
+    start_iso, end_iso = period_bounds(year, month)
+    with transaction(conn):
+        cols = load_shift_columns(conn, start_iso, end_iso)
+        new = recompute_columns(cols, prod_cal, base_amount, lunch_min, arithmetic)
+        fields = ("duration_min", "undertime_min", "overtime_min", "day_pay_cents", "overtime_pay_cents")
+        old_rows = zip(*(cols[f] for f in fields))
+        new_rows = zip(*(new[f] for f in fields))
+        updates = [new_row + (day,) for day, old_row, new_row in zip(cols["day"], old_rows, new_rows) if old_row != new_row]
+        if updates:
+            cur = statement_cursor(conn, "recompute_shifts")
+            cur.executemany("UPDATE shifts SET duration_min=?, undertime_min=?, overtime_min=?, day_pay_cents=?, overtime_pay_cents=? WHERE day=?", updates)
+    return len(updates)
@@ -0,0 +1,129 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+import os
+from decimal import Decimal
+from .database import init_db, connect
+from .settings import Settings
+from .utils import center_window
+from .profile_manager import parse_hhmm_to_min
+
+def create_profile_window(manager, master):
+    dlg = tk.Toplevel(master)
+    dlg.title("Создать профиль")
+    dlg.resizable(False, False)
+    dlg.geometry("450x500")
+    center_window(dlg, 450, 500)
+    frame = ttk.Frame(dlg, padding=20)
+    frame.pack(fill="both", expand=True)
+    ttk.Label(frame, text="Фамилия и Имя:", font=("Segoe UI", 12)).grid(row=0, column=0, sticky="w", pady=10)
+    ent_name = ttk.Entry(frame, width=40, font=("Segoe UI", 12))
+    ent_name.grid(row=0, column=1, pady=10)
+    ttk.Label(frame, text="Зарплата:", font=("Segoe UI", 12)).grid(row=1, column=0, sticky="w", pady=10)
+    ent_salary = ttk.Entry(frame, width=40, font=("Segoe UI", 12))
+    ent_salary.grid(row=1, column=1, pady=10)
+    ttk.Label(frame, text="Время обеда (HH:MM):", font=("Segoe UI", 12)).grid(row=2, column=0, sticky="w", pady=10)
+    ent_lunch = ttk.Entry(frame, width=40, font=("Segoe UI", 12))
+    ent_lunch.grid(row=2, column=1, pady=10)
+    ttk.Label(frame, text="Пин-Код:", font=("Segoe UI", 12)).grid(row=3, column=0, sticky="w", pady=10)
+    ent_pin = ttk.Entry(frame, show="*", width=40, font=("Segoe UI", 12))
+    ent_pin.grid(row=3, column=1, pady=10)
+    ttk.Label(frame, text="Повторите Пин-Код:", font=("Segoe UI", 12)).grid(row=4, column=0, sticky="w", pady=10)
+    ent_repeat = ttk.Entry(frame, show="*", width=40, font=("Segoe UI", 12))
+    ent_repeat.grid(row=4, column=1, pady=10)
+    def on_create():
+        name = ent_name.get().strip()
+        if not name:
+            messagebox.showerror("Ошибка", "Введите имя")
+            return
+        db_path = os.path.join(manager.profiles_dir, f"{name}.db")
+        # файл мог остаться от клиента без реестра — открывать его как новый профиль нельзя
+        if name in manager.get_profiles(fresh=True) or os.path.exists(db_path):
+            messagebox.showerror("Ошибка", "Профиль существует")
+            return
+        try:
+            salary = Decimal(ent_salary.get().strip())
+        except:
+            messagebox.showerror("Ошибка", "Неверная зарплата")
+            return
+        lunch_str = ent_lunch.get().strip()
+        try:
+            lunch_min = parse_hhmm_to_min(lunch_str)
+        except:
+            messagebox.showerror("Ошибка", "Время обеда HH:MM")
+            return
+        pin = ent_pin.get()
+        repeat = ent_repeat.get()
+        if pin != repeat:
+            messagebox.showerror("Ошибка", "Пины не совпадают")
+            return
+        if not pin.isdigit():
+            messagebox.showerror("Ошибка", "Пин должен быть цифрами")
+            return
+        conn = connect(db_path)
+        init_db(conn)
+        Settings.defaults().update({'salary': salary, 'lunch_min': lunch_min}).save(conn)
+        conn.close()
+        # файл БД создаётся раньше записи в реестр; не попавший в реестр файл удаляется,
+        # иначе следующая попытка с тем же именем упрётся в os.path.exists выше
+        try:
+            added = manager.add_profile(name, db_path, pin)
+        except Exception:
+            os.remove(db_path)
+            raise
+        if not added:
+            os.remove(db_path)
+            messagebox.showerror("Ошибка", "Профиль существует")
+            return
+        messagebox.showinfo("Успех", "Профиль создан")
+        dlg.destroy()
+    ttk.Button(frame, text="Создать", command=on_create).grid(row=5, column=0, columnspan=2, pady=20)
+    dlg.grab_set()
+    master.wait_window(dlg)
+
+def select_profile_window(manager, master):
+    profiles = manager.get_profiles()
+    if not profiles:
+        messagebox.showinfo("Нет профилей", "Создайте профиль сначала")
+        return None
+    dlg = tk.Toplevel(master)
+    dlg.title("Выбрать профиль")
+    dlg.resizable(False, False)
+    dlg.geometry("450x350")
+    center_window(dlg, 450, 350)
+    frame = ttk.Frame(dlg, padding=20)
+    frame.pack(fill="both", expand=True)
+    ttk.Label(frame, text="Выберите профиль:", font=("Segoe UI", 12)).pack(pady=10)
+    cmb = ttk.Combobox(frame, values=profiles, state="readonly", width=40, font=("Segoe UI", 12))
+    cmb.pack(pady=10)
+    shown_version = manager.catalog_version
+    sync_id = None
+    def sync_catalog():
+        # список открыт из кэша; если фоновая сверка нашла изменения — обновить его
+        nonlocal shown_version, sync_id
+        if manager.catalog_version != shown_version:
+            shown_version = manager.catalog_version
+            cmb.config(values=manager.get_profiles())
+        sync_id = dlg.after(500, sync_catalog)
+    def stop_sync(event):
+        # <Destroy> приходит и от дочерних виджетов; опрос снимается вместе с самим окном
+        if event.widget is dlg and sync_id is not None:
+            dlg.after_cancel(sync_id)
+    sync_id = dlg.after(500, sync_catalog)
+    dlg.bind("<Destroy>", stop_sync)
+    ttk.Label(frame, text="Пин-Код:", font=("Segoe UI", 12)).pack(pady=15)
+    ent_pin = ttk.Entry(frame, show="*", width=30, font=("Segoe UI", 12))
+    ent_pin.pack(pady=10)
+    selected = None
+    def on_select():
+        nonlocal selected
+        name = cmb.get()
+        pin = ent_pin.get()
+        if name and manager.check_pin(name, pin):
+            selected = name
+            dlg.destroy()
+        else:
+            messagebox.showerror("Ошибка", "Неверный пин")
+    ttk.Button(frame, text="Войти", command=on_select).pack(pady=20)
+    dlg.grab_set()
+    master.wait_window(dlg)
+    return selected
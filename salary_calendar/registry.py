@@ -0,0 +1,142 @@
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from . import database
+
+PIN_ITERATIONS = 100000
+
+def registry_path(profiles_dir):
+    return os.path.join(profiles_dir, "Pin", "registry.db")
+
+def catalog_stamp_path(registry_file):
+    # отметка списка профилей: меняется только при добавлении и переименовании,
+    # запись сводок в реестр её не трогает, и клиенты не пересканируют каталог после каждого сохранения
+    return registry_file + ".catalog"
+
+def hash_pin(pin, salt=None):
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", pin.encode("utf-8"), bytes.fromhex(salt), PIN_ITERATIONS)
+    return digest.hex(), salt
+
+class ProfileRegistry:
+    # Реестр профилей в одной SQLite-БД на шаре: имя, путь к БД, хэш пина и сводка (последняя смена,
+    # итог текущего месяца). Поиск и переименование — одна строка по первичному ключу в транзакции,
+    # вместо полного переписывания pins.json и обхода папки.
+    def __init__(self, path):
+        self.path = path
+        self.conn = database.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, database.transaction(self.conn):
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS profiles (
+                name TEXT PRIMARY KEY,
+                db_path TEXT NOT NULL,
+                pin_hash TEXT,
+                pin_salt TEXT,
+                last_shift_day TEXT,
+                summary_month TEXT,
+                month_total_cents INTEGER
+            )""")
+        self.stamp_path = catalog_stamp_path(path)
+        if not os.path.exists(self.stamp_path):
+            self._touch_catalog()
+
+    def _touch_catalog(self):
+        with open(self.stamp_path, 'w') as f:
+            f.write(str(time.time_ns()))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def names(self):
+        with self._lock:
+            cur = database.statement_cursor(self.conn, "registry_names")
+            cur.execute("SELECT name FROM profiles ORDER BY name")
+            return [r[0] for r in cur.fetchall()]
+
+    def get(self, name):
+        # {"name", "db_path", "last_shift_day", "summary_month", "month_total_cents"} или None
+        with self._lock:
+            cur = database.statement_cursor(self.conn, "registry_get")
+            cur.execute("SELECT name, db_path, last_shift_day, summary_month, month_total_cents FROM profiles WHERE name=?", (name,))
+            row = cur.fetchone()
+        if row is None: return None
+        return dict(zip(("name", "db_path", "last_shift_day", "summary_month", "month_total_cents"), row))
+
+    def add(self, name, db_path, pin):
+        # False, если профиль с таким именем уже есть
+        pin_hash, salt = hash_pin(pin)
+        try:
+            with self._lock, database.transaction(self.conn):
+                self.conn.execute("INSERT INTO profiles (name, db_path, pin_hash, pin_salt) VALUES (?, ?, ?, ?)",
+                                  (name, db_path, pin_hash, salt))
+        except sqlite3.IntegrityError:
+            return False
+        self._touch_catalog()
+        return True
+
+    def check_pin(self, name, pin):
+        with self._lock:
+            cur = database.statement_cursor(self.conn, "registry_pin")
+            cur.execute("SELECT pin_hash, pin_salt FROM profiles WHERE name=?", (name,))
+            row = cur.fetchone()
+        if not row or not row[0]: return False
+        return hmac.compare_digest(hash_pin(pin, row[1])[0], row[0])
+
+    def set_pin(self, name, pin):
+        pin_hash, salt = hash_pin(pin)
+        with self._lock, database.transaction(self.conn):
+            self.conn.execute("UPDATE profiles SET pin_hash=?, pin_salt=? WHERE name=?", (pin_hash, salt, name))
+
+    def rename(self, old_name, new_name, new_db_path):
+        # False, если новое имя занято; строка меняется целиком в одной транзакции
+        try:
+            with self._lock, database.transaction(self.conn):
+                cur = self.conn.execute("UPDATE profiles SET name=?, db_path=? WHERE name=?", (new_name, new_db_path, old_name))
+        except sqlite3.IntegrityError:
+            return False
+        if cur.rowcount != 1: return False
+        self._touch_catalog()
+        return True
+
+    def update_summary(self, name, last_shift_day, summary_month, month_total_cents):
+        with self._lock, database.transaction(self.conn):
+            self.conn.execute("UPDATE profiles SET last_shift_day=?, summary_month=?, month_total_cents=? WHERE name=?",
+                              (last_shift_day, summary_month, month_total_cents, name))
+
+    def migrate_legacy(self, profiles_dir, pin_file):
+        # Однократный перенос: *.db из папки профилей и пины из pins.json. Отметка — PRAGMA user_version.
+        with self._lock:
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] >= 1: return 0
+            pins = {}
+            if os.path.exists(pin_file):
+                with open(pin_file, 'r') as f:
+                    pins = json.load(f)
+            rows = []
+            for f in sorted(os.listdir(profiles_dir)):
+                if not f.endswith('.db'): continue
+                name = f[:-3]
+                pin = pins.get(name)
+                pin_hash, salt = hash_pin(pin) if pin else (None, None)
+                rows.append((name, os.path.join(profiles_dir, f), pin_hash, salt))
+            with database.transaction(self.conn):
+                cur = self.conn.executemany("INSERT OR IGNORE INTO profiles (name, db_path, pin_hash, pin_salt) VALUES (?, ?, ?, ?)", rows)
+                self.conn.execute("PRAGMA user_version=1")
+            self._touch_catalog()
+            return cur.rowcount
+
+def list_profiles(profiles_dir):
+    # [(имя, путь к БД)] для фоновых отчётов: из реестра, пока его нет — по файлам папки
+    path = registry_path(profiles_dir)
+    if os.path.exists(path):
+        conn = database.connect(path, read_only=True)
+        try:
+            return conn.execute("SELECT name, db_path FROM profiles ORDER BY name").fetchall()
+        finally:
+            conn.close()
+    return [(f[:-3], os.path.join(profiles_dir, f)) for f in sorted(os.listdir(profiles_dir)) if f.endswith('.db')]
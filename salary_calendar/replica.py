@@ -0,0 +1,121 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from . import database
+
+class LocalReplica:
+    # Локальная копия БД профиля: чтение и запись идут в локальный файл,
+    # фоновый поток переносит изменения на сетевую шару через backup API.
+    retry_seconds = 30
+
+    def __init__(self, remote_path, local_dir):
+        self.remote_path = remote_path
+        self.local_dir = local_dir
+        self.local_path = os.path.join(local_dir, os.path.basename(remote_path))
+        self.state_path = self.local_path + ".sync.json"
+        self.conflict = False
+        self.conflict_copy = None
+        self.last_error = None
+        self._remote_stamp = None
+        self._dirty = False
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def _stamp(self, path=None):
+        try:
+            st = os.stat(path or self.remote_path)
+        except OSError:
+            return None
+        return [st.st_mtime_ns, st.st_size]
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self):
+        with open(self.state_path, 'w') as f:
+            json.dump({"remote": self._remote_stamp, "local": self._stamp(self.local_path)}, f)
+
+    def _keep_conflict_copy(self):
+        self.conflict_copy = f"{os.path.splitext(self.local_path)[0]}.conflict-{time.strftime('%Y%m%d-%H%M%S')}.db"
+        self._copy(self.local_path, self.conflict_copy)
+
+    def _copy(self, src_path, dst_path):
+        src = sqlite3.connect(src_path)
+        dst = sqlite3.connect(dst_path)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+
+    def pull(self):
+        os.makedirs(self.local_dir, exist_ok=True)
+        state = self._load_state()
+        if state and os.path.exists(self.local_path) and self._stamp(self.local_path) != state["local"]:
+            # прошлая сессия не успела отправить изменения на шару
+            if self._stamp() == state["remote"]:
+                self._remote_stamp = state["remote"]
+                self._dirty = True
+                return
+            self._keep_conflict_copy()
+        self._copy(self.remote_path, self.local_path)
+        self._remote_stamp = self._stamp()
+        self._save_state()
+
+    def connect(self, **kwargs):
+        self.pull()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="replica-writeback", daemon=True)
+            self._thread.start()
+        if self._dirty:
+            self.schedule_push()
+        return database.connect(self.local_path, pragmas=database.LOCAL_PRAGMAS, **kwargs)
+
+    def schedule_push(self):
+        self._queue.put(True)
+
+    def close(self):
+        if self._thread is None: return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _push(self):
+        if self.conflict: return
+        if self._stamp() != self._remote_stamp:
+            # удалённую копию изменил кто-то другой — не перезаписываем её
+            self.conflict = True
+            self._keep_conflict_copy()
+            return
+        self._copy(self.local_path, self.remote_path)
+        self._remote_stamp = self._stamp()
+        self._save_state()
+
+    def _run(self):
+        while True:
+            try:
+                items = [self._queue.get(timeout=self.retry_seconds if self._dirty else None)]
+            except queue.Empty:
+                items = []
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if items or self._dirty:
+                self._dirty = True
+                try:
+                    self._push()
+                    self._dirty = False
+                    self.last_error = None
+                except (OSError, sqlite3.Error) as e:
+                    self.last_error = e
+            if None in items:
+                return
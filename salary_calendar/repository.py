@@ -0,0 +1,145 @@
+import calendar
+from collections import OrderedDict
+from datetime import date
+from . import database, events, month_view
+
+def month_key(day_iso):
+    return int(day_iso[:4]), int(day_iso[5:7])
+
+def month_bounds(year, month):
+    last = calendar.monthrange(year, month)[1]
+    return date(year, month, 1).isoformat(), date(year, month, last).isoformat()
+
+def months_between(start_iso, end_iso):
+    y, m = month_key(start_iso)
+    end = month_key(end_iso)
+    keys = []
+    while (y, m) <= end:
+        keys.append((y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return keys
+
+def load_month_data(repo, ledger, year, month):
+    # данные для отрисовки месяца без Tk: смены видимых недель (одна выборка на недостающие страницы),
+    # итоги недель {понедельник: минуты} и (первая половина, вторая половина, переработка месяца) из журнала
+    shifts = repo.load_shifts_between(*month_view.visible_range(year, month))
+    weeks = {}
+    for week in month_view.visible_weeks(year, month):
+        iso = week[0].isocalendar()
+        weeks[week[0]] = ledger.week(iso[0], iso[1])[1]
+    totals = (ledger.half_month(year, month, 1)[0], ledger.half_month(year, month, 2)[0], ledger.month(year, month)[2])
+    return shifts, weeks, totals
+
+class ShiftRepository:
+    # Кэш смен по страницам-месяцам (LRU). Все записи идут через репозиторий,
+    # поэтому страницы обновляются или сбрасываются сразу после записи в БД.
+    def __init__(self, conn, max_pages=12, ledger=None):
+        self.conn = conn
+        self.ledger = ledger
+        self.max_pages = max(3, max_pages)
+        self.pages = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, key, page):
+        self.pages[key] = page
+        self.pages.move_to_end(key)
+        while len(self.pages) > self.max_pages:
+            self.pages.popitem(last=False)
+
+    def month(self, year, month):
+        key = (year, month)
+        page = self.pages.get(key)
+        if page is not None:
+            self.hits += 1
+            self.pages.move_to_end(key)
+            return page
+        self.misses += 1
+        page = database.load_shifts_between(self.conn, *month_bounds(year, month))
+        self._store(key, page)
+        return page
+
+    def load_shift(self, day_iso):
+        return self.month(*month_key(day_iso)).get(day_iso)
+
+    def load_shifts_between(self, start_iso, end_iso):
+        keys = months_between(start_iso, end_iso)
+        pages = {k: self.pages[k] for k in keys if k in self.pages}
+        missing = [k for k in keys if k not in pages]
+        self.hits += len(pages)
+        self.misses += len(missing)
+        if missing:
+            # одна выборка на весь диапазон недостающих месяцев
+            rows = database.load_shifts_between(self.conn, month_bounds(*missing[0])[0], month_bounds(*missing[-1])[1])
+            for k in missing:
+                pages[k] = {}
+            for day_iso, row in rows.items():
+                k = month_key(day_iso)
+                if k in missing:
+                    pages[k][day_iso] = row
+        result = {}
+        for k in keys:
+            self._store(k, pages[k])
+            for day_iso, row in pages[k].items():
+                if start_iso <= day_iso <= end_iso:
+                    result[day_iso] = row
+        return result
+
+    def save_shift(self, day_iso, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes):
+        database.save_shift(self.conn, day_iso, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes)
+        row = (activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents, notes)
+        page = self.pages.get(month_key(day_iso))
+        if page is not None:
+            page[day_iso] = row
+        if self.ledger is not None:
+            self.ledger.apply(day_iso, row)
+
+    def delete_shift(self, day_iso):
+        database.delete_shift(self.conn, day_iso)
+        page = self.pages.get(month_key(day_iso))
+        if page is not None:
+            page.pop(day_iso, None)
+        if self.ledger is not None:
+            self.ledger.apply(day_iso, None)
+
+    def add_overtime_pay(self, day_iso, add_cents):
+        events.add_overtime_pay(self.conn, day_iso, add_cents)
+        self._changed([day_iso])
+
+    def distribute_overtime_minutes(self, year, month, half, source_day_iso, available_overtime_min):
+        remaining, used_map = events.distribute_overtime_minutes(self.conn, year, month, half, source_day_iso, available_overtime_min)
+        if used_map:
+            self._changed(list(used_map) + [source_day_iso])
+        return remaining, used_map
+
+    def distribute_pending_overtime(self, year=None, month=None):
+        summary = events.distribute_pending_overtime(self.conn, year, month)
+        self._changed(summary["changed_days"])
+        return summary
+
+    def _changed(self, days):
+        for day_iso in days:
+            self.invalidate(day_iso)
+        if self.ledger is not None:
+            self.ledger.refresh(self.conn, days)
+
+    def reload(self):
+        # после массовых изменений (пересчёт, импорт): сбросить кэш и пересобрать итоги
+        self.pages.clear()
+        if self.ledger is not None:
+            self.ledger.rebuild(self.conn)
+
+    def invalidate(self, day_iso=None):
+        if day_iso is None:
+            self.pages.clear()
+        else:
+            self.pages.pop(month_key(day_iso), None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "pages": len(self.pages),
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
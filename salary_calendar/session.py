@@ -0,0 +1,100 @@
+import json
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+from . import calculations
+
+# Активная смена «Начать смену» / «Закончить смену». Всё, что нужно тикеру (начало, ставка часа,
+# норма, выходной ли день), фиксируется при старте и живёт в памяти: тик не читает БД и не
+# перерисовывает сетку. Журнал — маленький JSON рядом с БД профиля, по нему смена восстанавливается
+# после падения; в shifts пишутся строка начала и одна итоговая строка при завершении.
+MAX_SESSION_AGE = timedelta(hours=24)
+
+def journal_path(db_path):
+    return db_path + ".session.json"
+
+def kept_from_row(existing):
+    # (заметки, доплата) строки дня, которые смена не должна затирать (existing — строка load_shift).
+    # Доплата переносится только из открытой строки: у строки с концом overtime_pay_cents уже
+    # включает оплату её собственной переработки, и final_row посчитал бы её второй раз.
+    if not existing: return "", 0
+    return existing[7] or "", 0 if existing[1] else existing[6] or 0
+
+class ShiftSession:
+    def __init__(self, started, hourly_rate, required_minutes, lunch_min, is_weekend, journal=None):
+        self.started = started.replace(second=0, microsecond=0)
+        self.hourly_rate = hourly_rate
+        self.required_minutes = required_minutes
+        self.lunch_min = lunch_min
+        self.is_weekend = is_weekend
+        self.journal = journal
+        self.day_pay_cents = calculations.day_base_pay(hourly_rate)
+
+    @property
+    def day_iso(self):
+        return self.started.date().isoformat()
+
+    @property
+    def activation(self):
+        return self.started.strftime("%H:%M")
+
+    @property
+    def expected_end(self):
+        return (self.started + timedelta(minutes=self.required_minutes)).strftime("%H:%M")
+
+    def earned_cents(self, now):
+        # заработок на момент now: в будни дневная ставка набирается пропорционально норме,
+        # сверх нормы добавляется оплата переработки; в выходной — как weekend_pay_for_duration
+        seconds = max(0, int((now - self.started).total_seconds()))
+        minutes = seconds // 60
+        if self.is_weekend:
+            return calculations.weekend_pay_for_duration(minutes, self.hourly_rate, self.lunch_min)
+        if minutes < self.required_minutes:
+            return self.day_pay_cents * seconds // (self.required_minutes * 60)
+        return self.day_pay_cents + calculations.calc_overtime_pay_minutes(minutes - self.required_minutes, self.hourly_rate)
+
+    def start_row(self, notes="", added_pay_cents=0):
+        # строка для save_shift при старте: есть начало, конца и своей оплаты ещё нет;
+        # added_pay_cents — доплата, уже начисленная на этот день (add_overtime_pay), она сохраняется
+        return (self.day_iso, self.activation, None, 0, 0, 0, 0, added_pay_cents, notes)
+
+    def final_row(self, now, notes="", added_pay_cents=0):
+        # итог теми же правилами, что и правка смены в диалоге, плюс уже начисленная доплата дня
+        end = now.strftime("%H:%M")
+        duration_min = calculations.shift_duration_min(self.activation, end)
+        undertime_min, overtime_min, day_pay_cents, overtime_pay_cents = calculations.compute_shift(
+            duration_min, self.hourly_rate, self.required_minutes, self.lunch_min, self.is_weekend)
+        return (self.day_iso, self.activation, end, duration_min, undertime_min, overtime_min, day_pay_cents,
+                overtime_pay_cents + added_pay_cents, notes)
+
+    def save_journal(self):
+        if not self.journal: return
+        tmp = self.journal + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump({"started": self.started.isoformat(), "hourly_rate": str(self.hourly_rate),
+                       "required_minutes": self.required_minutes, "lunch_min": self.lunch_min,
+                       "is_weekend": self.is_weekend}, f)
+        os.replace(tmp, self.journal)
+
+    def discard_journal(self):
+        if self.journal and os.path.exists(self.journal):
+            os.remove(self.journal)
+
+    def relocate(self, journal):
+        # после переименования профиля журнал переезжает вслед за БД
+        if self.journal and os.path.exists(self.journal):
+            os.replace(self.journal, journal)
+        self.journal = journal
+
+    @classmethod
+    def restore(cls, journal, now=None):
+        # незавершённая смена из журнала; старше суток или битый журнал не восстанавливается
+        try:
+            with open(journal, 'r') as f:
+                data = json.load(f)
+            session = cls(datetime.fromisoformat(data["started"]), Decimal(data["hourly_rate"]),
+                          int(data["required_minutes"]), int(data["lunch_min"]), bool(data["is_weekend"]), journal)
+        except (OSError, ValueError, KeyError, ArithmeticError):
+            return None
+        if (now or datetime.now()) - session.started > MAX_SESSION_AGE: return None
+        return session
@@ -0,0 +1,82 @@
+from decimal import Decimal, InvalidOperation
+from .database import statement_cursor, transaction
+
+DEFAULT_SALARY = Decimal('90610.5')
+DEFAULT_LUNCH_MIN = 60
+
+DEFAULT_COLORS = {
+    "other_month": "#f0f0f0",
+    "weekday_ok": "#c6efce",
+    "past_no_data": "#e8e8e8",
+    "future_current_month": "#d0d0d0",
+    "today": "#fff2a8",
+    "weekend": "#ffd9b3",
+    "undertime": "#ffcccc",
+    "header_bg": "#f7f7f7",
+    "gold": "#ffd700",
+    "weekly_overtime": "#d4f7d4",
+    "weekly_undertime": "#ffd8d8",
+}
+
+class Settings:
+    # Таблица settings профиля целиком: читается одним SELECT, значения разобраны в salary (Decimal),
+    # lunch_min (int) и colors. Правки копятся в changed и пишутся одной транзакцией в save().
+    # Для записи из потока worker правится копия (copy()), а в Tk-потоке она подменяет исходный объект.
+    def __init__(self, values=()):
+        self.values = dict(values)
+        self.changed = {}
+        self._parse()
+
+    @classmethod
+    def load(cls, conn):
+        cur = statement_cursor(conn, "load_settings")
+        cur.execute("SELECT key, value FROM settings")
+        return cls(cur.fetchall())
+
+    @classmethod
+    def defaults(cls):
+        # настройки нового профиля, все ключи помечены к записи
+        settings = cls()
+        settings.update({'salary': DEFAULT_SALARY, 'lunch_min': DEFAULT_LUNCH_MIN})
+        settings.update({f"color_{k}": v for k, v in DEFAULT_COLORS.items()})
+        return settings
+
+    def _parse(self):
+        try:
+            self.salary = Decimal(self.values.get('salary') or DEFAULT_SALARY)
+        except InvalidOperation:
+            self.salary = DEFAULT_SALARY
+        try:
+            self.lunch_min = int(self.values.get('lunch_min') or DEFAULT_LUNCH_MIN)
+        except ValueError:
+            self.lunch_min = DEFAULT_LUNCH_MIN
+        self.colors = dict(DEFAULT_COLORS)
+        for k in self.colors:
+            value = self.values.get(f"color_{k}")
+            if value:
+                self.colors[k] = value
+
+    @property
+    def required_minutes(self):
+        return 480 + self.lunch_min
+
+    def copy(self):
+        settings = Settings(self.values)
+        settings.changed = dict(self.changed)
+        return settings
+
+    def update(self, values):
+        for key, value in values.items():
+            value = str(value)
+            if self.values.get(key) != value:
+                self.values[key] = value
+                self.changed[key] = value
+        self._parse()
+        return self
+
+    def save(self, conn):
+        if not self.changed: return
+        with transaction(conn):
+            cur = statement_cursor(conn, "save_settings")
+            cur.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", list(self.changed.items()))
+        self.changed.clear()
@@ -0,0 +1,91 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from . import calculations, database
+from .constants import PROFILES_DIR, cents_to_money, format_minutes_hhmm
+from .holidays import DEFAULT_YEARS, load_manual_holidays
+from .ledger import contribution
+from .registry import list_profiles
+from .repository import month_bounds
+from .settings import Settings
+
+FIELDS = ["profile", "year", "month", "salary", "hourly_rate", "shifts", "worked",
+          "first_half", "second_half", "month_total", "pending_overtime", "elapsed_ms", "error"]
+
+def find_profiles(profiles_dir):
+    return [db_path for _name, db_path in list_profiles(profiles_dir)]
+
+def report_profile(db_path, year, month):
+    # Итоги одного профиля за месяц; выполняется в отдельном процессе, БД открывается только на чтение.
+    started = time.perf_counter()
+    row = {"profile": os.path.basename(db_path)[:-3], "year": year, "month": month, "error": ""}
+    try:
+        conn = database.connect(db_path, read_only=True)
+        try:
+            salary = Settings.load(conn).salary
+            shifts = database.load_shifts_between(conn, *month_bounds(year, month))
+            pending = database.find_pending_overtimes(conn, year, month)
+        finally:
+            conn.close()
+        halves = [0, 0]
+        worked = 0
+        for day_iso, shift in shifts.items():
+            pay, minutes, _pending = contribution(shift)
+            halves[0 if int(day_iso[8:10]) <= 15 else 1] += pay
+            worked += minutes
+        holidays_set, _names = load_manual_holidays(DEFAULT_YEARS)
+        row.update({
+            "salary": str(salary),
+            "hourly_rate": str(calculations.hourly_rate_for_month(year, month, holidays_set, salary)),
+            "shifts": len(shifts),
+            "worked": format_minutes_hhmm(worked),
+            "first_half": str(cents_to_money(halves[0])),
+            "second_half": str(cents_to_money(halves[1])),
+            "month_total": str(cents_to_money(halves[0] + halves[1])),
+            "pending_overtime": format_minutes_hhmm(sum(r[1] or 0 for r in pending)),
+        })
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return {k: row.get(k, "") for k in FIELDS}
+
+def run(profiles_dir, year, month, jobs=None):
+    paths = find_profiles(profiles_dir)
+    if not paths: return []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(report_profile, paths, [year] * len(paths), [month] * len(paths)))
+
+def write_report(rows, out, fmt, total_ms):
+    if fmt == "json":
+        json.dump({"profiles": rows, "total_ms": total_ms}, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+        return
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({k: row.get(k, "") for k in FIELDS})
+
+def main(argv=None):
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Сводный отчёт по зарплате всех профилей")
+    parser.add_argument("--profiles-dir", default=PROFILES_DIR)
+    parser.add_argument("--year", type=int, default=today.year)
+    parser.add_argument("--month", type=int, default=today.month)
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--output", help="файл отчёта (по умолчанию stdout)")
+    parser.add_argument("--jobs", type=int, help="число процессов (по умолчанию — по числу CPU)")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    rows = run(args.profiles_dir, args.year, args.month, args.jobs)
+    total_ms = round((time.perf_counter() - started) * 1000, 1)
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            write_report(rows, out, args.format, total_ms)
+    else:
+        write_report(rows, sys.stdout, args.format, total_ms)
+    return 1 if any(r["error"] for r in rows) else 0
@@ -1,18 +1,36 @@
+import calendar
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
 from .utils import center_window
 
 class Tooltip(tk.Toplevel):
-    def __init__(self, parent, lines, edit_callback):
+    # Одно окно подсказки на весь календарь: создаётся один раз, между показами прячется (withdraw),
+    # текст и команда кнопки обновляются на месте.
+    def __init__(self, parent):
         super().__init__(parent)
         self.wm_overrideredirect(True)
         self.attributes("-topmost", True)
+        self.withdraw()
         frm = ttk.Frame(self, relief="solid", borderwidth=1)
         frm.pack(fill="both", expand=True)
-        for ln in lines:
-            ttk.Label(frm, text=ln).pack(anchor="w", padx=6, pady=0)
-        ttk.Button(frm, text="Редактировать", command=edit_callback).pack(padx=6, pady=6)
+        self.label = ttk.Label(frm, text="", justify="left")
+        self.label.pack(anchor="w", padx=6, pady=0)
+        self.edit_callback = None
+        ttk.Button(frm, text="Редактировать", command=self._on_edit).pack(padx=6, pady=6)
+        self.visible = False
+    def _on_edit(self):
+        if self.edit_callback: self.edit_callback()
+    def show(self, lines, edit_callback, x, y):
+        text = "\n".join(lines)
+        if self.label.cget("text") != text:
+            self.label.config(text=text)
+        self.edit_callback = edit_callback
+        self.show_at(x, y)
+        if not self.visible:
+            self.deiconify()
+            self.lift()
+            self.visible = True
     def show_at(self, x, y):
         try:
             sw = self.winfo_screenwidth()
@@ -24,19 +42,151 @@ class Tooltip(tk.Toplevel):
         except Exception:
             pass
         self.wm_geometry(f"+{x}+{y}")
+    def hide(self):
+        if self.visible:
+            self.withdraw()
+            self.visible = False
     def close(self):
         try: self.destroy()
         except: pass
 
+class HintTooltip:
+    # Подсказка к кнопке: окно создаётся при первом наведении и дальше только показывается/прячется
+    def __init__(self, widget, text):
+        self.widget = widget
+        self.text = text
+        self.window = None
+        widget.bind("<Enter>", self.show, add="+")
+        widget.bind("<Leave>", self.hide, add="+")
+    def show(self, event=None):
+        if self.window is None:
+            self.window = tk.Toplevel(self.widget)
+            self.window.wm_overrideredirect(True)
+            tk.Label(self.window, text=self.text, background="yellow", relief="solid", borderwidth=1).pack()
+        else:
+            self.window.deiconify()
+        self.window.wm_geometry(f"+{self.widget.winfo_rootx() + 25}+{self.widget.winfo_rooty() + 25}")
+    def hide(self, event=None):
+        if self.window is not None:
+            self.window.withdraw()
+
+class DebugPanel(tk.Toplevel):
+    # Скрытая панель замеров (Shift+клик по кнопке настроек): запросы и фазы из instrument.snapshot()
+    def __init__(self, parent, snapshot, reset, dump):
+        super().__init__(parent)
+        self.title("Отладка: замеры")
+        self.geometry("900x520")
+        self.snapshot = snapshot
+        self.reset = reset
+        self.dump = dump
+        self.txt = tk.Text(self, wrap="none", font=("Consolas", 9))
+        self.txt.pack(fill="both", expand=True)
+        btns = ttk.Frame(self)
+        btns.pack(fill="x", pady=4)
+        ttk.Button(btns, text="Обновить", command=self.refresh).pack(side="left", padx=6)
+        ttk.Button(btns, text="Сбросить", command=self._on_reset).pack(side="left", padx=6)
+        ttk.Button(btns, text="Сохранить JSON", command=self._on_dump).pack(side="left", padx=6)
+        self.refresh()
+    def refresh(self):
+        data = self.snapshot()
+        lines = []
+        if not data["enabled"]:
+            lines.append("Замеры выключены: запустите с SALARY_CALENDAR_INSTRUMENT=1 (или SALARY_CALENDAR_PROFILE=1)")
+        lines.append(f"Время работы: {data['uptime_s']} c")
+        for name, values in data.get("counters", {}).items():
+            lines.append(f"{name}: " + ", ".join(f"{k}={v}" for k, v in values.items()))
+        for title, rows in (("Фазы", data["phases"]), ("Запросы", data["queries"])):
+            lines += ["", f"{title}:", f"{'всего, мс':>10} {'раз':>7} {'сред., мс':>10} {'макс., мс':>10}  имя"]
+            for r in rows:
+                lines.append(f"{r['total_ms']:>10.2f} {r['count']:>7} {r['avg_ms'] or 0:>10.3f} {r['max_ms']:>10.3f}  {r['name']}")
+        if data.get("profile"):
+            lines += ["", "cProfile (cumtime):"]
+        for r in data.get("profile", []):
+            lines.append(f"{r['cumtime_ms']:>10.2f} {r['calls']:>7}  {r['function']}")
+        self.txt.delete("1.0", tk.END)
+        self.txt.insert("1.0", "\n".join(lines))
+    def _on_reset(self):
+        self.reset()
+        self.refresh()
+    def _on_dump(self):
+        messagebox.showinfo("Замеры", f"Сохранено: {self.dump()}", parent=self)
+
+class YearView(tk.Toplevel):
+    # Обзор года на одном Canvas: 12 мини-календарей, прямоугольники дней создаются один раз,
+    # при смене года меняются только заливка и видимость.
+    cell = 16
+    gap = 2
+    block_w = 7 * (cell + gap) + 24
+    block_h = 6 * (cell + gap) + 48
+
+    def __init__(self, parent, year, on_year, on_day):
+        super().__init__(parent)
+        self.title("Обзор года")
+        self.resizable(False, False)
+        self.on_year = on_year
+        self.on_day = on_day
+        self.year = year
+        top = ttk.Frame(self)
+        top.pack(fill="x", padx=8, pady=6)
+        ttk.Button(top, text="◀", width=3, command=lambda: self.on_year(self.year - 1)).pack(side="left")
+        ttk.Button(top, text="▶", width=3, command=lambda: self.on_year(self.year + 1)).pack(side="left")
+        self.lbl_year = ttk.Label(top, text=str(year), font=("Segoe UI", 14, "bold"))
+        self.lbl_year.pack(side="left", expand=True)
+        self.canvas = tk.Canvas(self, width=4 * self.block_w, height=3 * self.block_h, bg="white", highlightthickness=0)
+        self.canvas.pack(padx=8, pady=(0, 8))
+        self.rects = {}
+        self.captions = {}
+        self.dates = {}
+        self.fills = {}
+        for m in range(1, 13):
+            x0 = ((m - 1) % 4) * self.block_w + 12
+            y0 = ((m - 1) // 4) * self.block_h + 4
+            self.canvas.create_text(x0, y0, anchor="nw", text=calendar.month_name[m], font=("Segoe UI", 9, "bold"))
+            for r in range(6):
+                for c in range(7):
+                    x = x0 + c * (self.cell + self.gap)
+                    y = y0 + 18 + r * (self.cell + self.gap)
+                    item = self.canvas.create_rectangle(x, y, x + self.cell, y + self.cell, outline="", state="hidden")
+                    self.rects[(m, r, c)] = item
+            self.captions[m] = self.canvas.create_text(x0, y0 + 22 + 6 * (self.cell + self.gap), anchor="nw", text="", font=("Segoe UI", 8))
+        self.canvas.bind("<Button-1>", self._on_click)
+
+    def show_year(self, year, months, captions, today=None):
+        self.year = year
+        self.lbl_year.config(text=str(year))
+        self.title(f"Обзор года {year}")
+        self.dates = {}
+        shown = set()
+        for m, cells in months.items():
+            for d, r, c, color in cells:
+                item = self.rects[(m, r, c)]
+                shown.add(item)
+                self.dates[item] = d
+                outline = "black" if d == today else ""
+                if self.fills.get(item) != (color, outline):
+                    self.canvas.itemconfigure(item, fill=color, outline=outline, state="normal")
+                    self.fills[item] = (color, outline)
+            self.canvas.itemconfigure(self.captions[m], text=captions.get(m, ""))
+        for item in self.rects.values():
+            if item not in shown and self.fills.get(item) is not None:
+                self.canvas.itemconfigure(item, state="hidden")
+                self.fills[item] = None
+
+    def _on_click(self, event):
+        for item in self.canvas.find_overlapping(event.x, event.y, event.x, event.y):
+            d = self.dates.get(item)
+            if d:
+                self.on_day(d)
+                return
+
 class EditShiftDialog(tk.Toplevel):
-    def __init__(self, parent, day, existing, conn, lunch_min):
+    def __init__(self, parent, day, existing, lunch_min):
         super().__init__(parent)
         self.title(f"Редактирование {day.isoformat()}")
         self.resizable(False, False)
         self.geometry("500x400")
         center_window(self, 500, 400)
         self.result = None
-        self.conn = conn
         self.lunch_min = lunch_min
         frm = ttk.Frame(self, padding=15)
         frm.pack(fill="both", expand=True)
@@ -76,9 +226,7 @@ class EditShiftDialog(tk.Toplevel):
         self._on_save()
 
     def _on_delete(self):
-        from . import database
         if not messagebox.askyesno("Подтвердить", "Удалить запись?"): return
-        database.delete_shift(self.conn, self.day.isoformat())
         self.result = {"deleted": True}
         self.destroy()
 
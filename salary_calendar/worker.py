@@ -0,0 +1,72 @@
+import queue
+import threading
+from . import instrument
+
+class DbWorker:
+    # Поток, которому принадлежит соединение с БД профиля. Tk-поток ставит задачи в очередь и не ждёт;
+    # ответы забираются опросом через master.after и передаются в callback уже в потоке Tk.
+    # Задачи с ключом нумеруются поколениями: ответ устаревшей задачи (месяц, с которого уже ушли) отбрасывается.
+    poll_ms = 15
+
+    def __init__(self, master, on_error=None):
+        self.master = master
+        self.on_error = on_error
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._generations = {}
+        self._pending = 0
+        self._polling = None
+        self._thread = threading.Thread(target=self._run, name="db-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, callback=None, errback=None, key=None):
+        # fn(*args) выполняется в потоке worker, callback(result) / errback(error) — в потоке Tk
+        token = None
+        if key is not None:
+            token = self._generations[key] = self._generations.get(key, 0) + 1
+        self._pending += 1
+        self._requests.put((fn, args, callback, errback, key, token))
+        if self._polling is None:
+            self._polling = self.master.after(self.poll_ms, self._poll)
+        return token
+
+    def is_current(self, key, token):
+        return self._generations.get(key) == token
+
+    def _run(self):
+        instrument.profile_thread()
+        while True:
+            item = self._requests.get()
+            if item is None: return
+            fn, args, callback, errback, key, token = item
+            try:
+                result, error = fn(*args), None
+            except Exception as e:
+                result, error = None, e
+            self._results.put((callback, errback or self.on_error, key, token, result, error))
+
+    def _poll(self):
+        self._polling = None
+        delivered = []
+        while True:
+            try:
+                delivered.append(self._results.get_nowait())
+            except queue.Empty:
+                break
+        self._pending -= len(delivered)
+        if self._pending:
+            self._polling = self.master.after(self.poll_ms, self._poll)
+        for callback, errback, key, token, result, error in delivered:
+            if key is not None and not self.is_current(key, token): continue
+            if error is not None:
+                if errback is None: raise error
+                errback(error)
+            elif callback is not None:
+                callback(result)
+
+    def close(self):
+        # дожидается уже поставленных задач (в том числе записей)
+        if self._thread is None: return
+        self._requests.put(None)
+        self._thread.join()
+        self._thread = None
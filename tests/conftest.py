@@ -0,0 +1,49 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from salary_calendar import database
+from synthetic import generate_profile
+
+# Синтетический профиль: по умолчанию 2 года с 2024-го; параметры меняются маркером
+#   @pytest.mark.profile(years=3, seed=7, analyze=True)
+PROFILE_DEFAULTS = {"years": 2, "start_year": 2024, "seed": 5, "analyze": False}
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "profile(years, start_year, seed, analyze): параметры синтетического профиля")
+
+@pytest.fixture
+def conn(request, tmp_path):
+    marker = request.node.get_closest_marker("profile")
+    options = dict(PROFILE_DEFAULTS, **(marker.kwargs if marker else {}))
+    path = str(tmp_path / "synthetic.db")
+    generate_profile(path, options["years"], options["start_year"], options["seed"])
+    conn = database.connect(path)
+    if options["analyze"]:
+        conn.execute("ANALYZE")
+    yield conn
+    conn.close()
+
+class SqlTrace:
+    # операторы, выполненные соединением внутри with, в развёрнутом виде (set_trace_callback)
+    def __init__(self, conn):
+        self.conn = conn
+        self.statements = []
+
+    def __enter__(self):
+        self.conn.set_trace_callback(self.statements.append)
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.set_trace_callback(None)
+
+    def selects(self, marker=""):
+        return [s for s in self.statements if s.lstrip().upper().startswith("SELECT") and marker in s]
+
+@pytest.fixture
+def sql_trace():
+    return SqlTrace
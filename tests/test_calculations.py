@@ -0,0 +1,37 @@
+from decimal import Decimal
+import pytest
+from salary_calendar import calculations
+from salary_calendar.constants import money_to_cents
+
+# Целочисленный путь в копейках должен совпадать с Decimal-путём до копейки.
+# Оклады с тремя и более знаками после запятой идут через _round_sig в hourly_rate_cents,
+# малые числа рабочих дней дают ставки, на которых overtime_pay_cents уходит в _stepwise.
+SALARIES = [Decimal(s) for s in ("0.01", "1234.5678", "15000", "33333.33", "33333.333", "45678.9", "90610.5",
+                                 "100000", "123456.78", "250000.5")]
+WORKING_DAYS = range(1, 24)
+LUNCH_MIN = 60
+
+@pytest.mark.parametrize("salary", SALARIES)
+@pytest.mark.parametrize("wd", WORKING_DAYS)
+def test_integer_path_matches_decimal(salary, wd):
+    rate = calculations.hourly_rate_for_working_days(wd, salary)
+    cents = calculations.hourly_rate_cents(wd, salary)
+    assert cents == money_to_cents(rate)
+    assert calculations.day_base_pay_cents(cents) == calculations.day_base_pay(rate)
+    for minutes in range(0, 1441):
+        assert calculations.overtime_pay_cents(minutes, cents) == calculations.calc_overtime_pay_minutes(minutes, rate), minutes
+        assert calculations.overtime_pay_cents(minutes, cents, True) == calculations.calc_overtime_pay_minutes(minutes, rate, True), minutes
+        assert (calculations.weekend_pay_for_duration_cents(minutes, cents, LUNCH_MIN)
+                == calculations.weekend_pay_for_duration(minutes, rate, LUNCH_MIN)), minutes
+
+def test_zero_working_days():
+    assert calculations.hourly_rate_cents(0, Decimal("90610.5")) == 0
+    assert calculations.hourly_rate_for_working_days(0, Decimal("90610.5")) == Decimal("0.00")
+
+def test_overtime_pay_by_rate():
+    # все ставки 0.00–200.00 на минутах у границ округления и ступени 120 минут
+    for hourly_cents in range(0, 20001):
+        rate = Decimal(hourly_cents) / 100
+        for minutes in (1, 59, 61, 119, 120, 121, 179, 181, 481, 601):
+            assert calculations.overtime_pay_cents(minutes, hourly_cents) == calculations.calc_overtime_pay_minutes(minutes, rate)
+            assert calculations.overtime_pay_cents(minutes, hourly_cents, True) == calculations.calc_overtime_pay_minutes(minutes, rate, True)
@@ -0,0 +1,37 @@
+from salary_calendar.ledger import PeriodLedger
+from salary_calendar.repository import ShiftRepository
+
+def _repo(conn):
+    ledger = PeriodLedger.build(conn)
+    return ShiftRepository(conn, ledger=ledger), ledger
+
+def _worked_day(conn, year, month):
+    return conn.execute("SELECT day FROM shifts WHERE day LIKE ? AND duration_min > 0 ORDER BY day LIMIT 1",
+                        (f"{year:04d}-{month:02d}-%",)).fetchone()[0]
+
+def test_fresh_ledger_verifies(conn):
+    assert PeriodLedger.build(conn).verify(conn) == []
+
+def test_repository_writes_keep_ledger_in_sync(conn):
+    repo, ledger = _repo(conn)
+    repo.save_shift("2024-03-04", "08:00", "19:00", 660, 0, 120, 4000, 1500, "")
+    repo.save_shift("2024-03-05", "08:00", "15:00", 420, 120, 0, 4000, 0, "")
+    assert ledger.verify(conn) == []
+    repo.delete_shift(_worked_day(conn, 2024, 4))
+    assert ledger.verify(conn) == []
+    repo.add_overtime_pay(_worked_day(conn, 2024, 5), 2500)
+    repo.add_overtime_pay("2024-06-01", 700)
+    assert ledger.verify(conn) == []
+    summary = repo.distribute_pending_overtime()
+    assert summary["changed_days"]
+    assert ledger.verify(conn) == []
+
+def test_write_around_repository_is_reported(conn):
+    repo, ledger = _repo(conn)
+    day = _worked_day(conn, 2024, 9)
+    with conn:
+        conn.execute("UPDATE shifts SET day_pay_cents = day_pay_cents + 100 WHERE day=?", (day,))
+    mismatches = ledger.verify(conn)
+    assert {k[0] for k, _old, _new in mismatches} == {"half", "week", "month"}
+    for _key, old, new in mismatches:
+        assert new[0] - old[0] == 100
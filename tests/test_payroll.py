@@ -0,0 +1,31 @@
+from datetime import date
+from decimal import Decimal
+import pytest
+from salary_calendar import calculations, payroll
+from salary_calendar.holidays import load_manual_holidays
+
+START_YEAR = 2024
+YEARS = 3
+
+@pytest.mark.profile(years=YEARS, start_year=START_YEAR, seed=3)
+@pytest.mark.parametrize("arithmetic", ["int", "decimal"])
+@pytest.mark.parametrize("salary, lunch_min", [(Decimal("90610.5"), 60), (Decimal("123456.78"), 45), (Decimal("55000"), 30)])
+def test_recompute_matches_compute_shift(conn, arithmetic, salary, lunch_min):
+    # пакетный пересчёт должен давать построчно то же, что compute_shift при сохранении дня в диалоге
+    prod_cal = calculations.ProductionCalendar(load_manual_holidays(range(START_YEAR, START_YEAR + YEARS))[0])
+    payroll.recompute_shifts(conn, prod_cal, salary, lunch_min, arithmetic=arithmetic)
+    rows = conn.execute("SELECT day, activation, end, duration_min, undertime_min, overtime_min, day_pay_cents, overtime_pay_cents "
+                        "FROM shifts WHERE duration_min IS NOT NULL").fetchall()
+    assert len(rows) > 500
+    for day, act, end, duration_min, undertime_min, overtime_min, day_pay, ot_pay in rows:
+        d = date.fromisoformat(day)
+        expected_duration = calculations.shift_duration_min(act, end)
+        expected = calculations.compute_shift(expected_duration, prod_cal.hourly_rate(d.year, d.month, salary),
+                                              480 + lunch_min, lunch_min, prod_cal.is_day_off(d))
+        assert (duration_min, undertime_min, overtime_min, day_pay, ot_pay) == (expected_duration,) + expected, day
+
+@pytest.mark.profile(years=YEARS, start_year=START_YEAR, seed=3)
+def test_recompute_is_idempotent(conn):
+    prod_cal = calculations.ProductionCalendar(load_manual_holidays(range(START_YEAR, START_YEAR + YEARS))[0])
+    payroll.recompute_shifts(conn, prod_cal, Decimal("100000"), 45)
+    assert payroll.recompute_shifts(conn, prod_cal, Decimal("100000"), 45) == 0
@@ -0,0 +1,27 @@
+import pytest
+from salary_calendar import database, events
+
+# EXPLAIN QUERY PLAN для запросов, которые должны идти по частичным индексам миграции 1.
+# Запрос берётся из trace callback в том виде, в котором его выполнила функция.
+
+def _traced_select(sql_trace, conn, marker, fn, *args):
+    with sql_trace(conn) as trace:
+        fn(*args)
+    selects = trace.selects(marker)
+    assert len(selects) == 1, trace.statements
+    return selects[0]
+
+def _plan(conn, sql):
+    return " | ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql))
+
+@pytest.mark.profile(years=3, seed=7, analyze=True)
+def test_pending_overtime_month_uses_partial_index(conn, sql_trace):
+    sql = _traced_select(sql_trace, conn, "overtime_min > 0", database.find_pending_overtimes, conn, 2025, 5)
+    assert "USING INDEX idx_shifts_pending_overtime" in _plan(conn, sql)
+
+@pytest.mark.profile(years=3, seed=7, analyze=True)
+def test_undertime_lookup_uses_partial_index(conn, sql_trace):
+    source, minutes = database.find_pending_overtimes(conn, 2025, 5)[0][:2]
+    half = 1 if int(source[8:10]) <= 15 else 2
+    sql = _traced_select(sql_trace, conn, "undertime_min > 0", events.distribute_overtime_minutes, conn, 2025, 5, half, source, minutes)
+    assert "USING INDEX idx_shifts_open_undertime" in _plan(conn, sql)
@@ -0,0 +1,60 @@
+import pytest
+from salary_calendar import database, month_view
+from salary_calendar.ledger import PeriodLedger
+from salary_calendar.repository import ShiftRepository, load_month_data, month_bounds, months_between
+
+@pytest.mark.profile(seed=5)
+def test_month_load_issues_one_select_per_missing_range(conn, sql_trace):
+    ledger = PeriodLedger.build(conn)
+    repo = ShiftRepository(conn, ledger=ledger)
+    for year, month in [(y, m) for y in (2024, 2025) for m in range(1, 13)]:
+        with sql_trace(conn) as trace:
+            load_month_data(repo, ledger, year, month)
+        # видимое окно — до трёх месяцев; недостающие страницы идут подряд и читаются одной выборкой
+        assert len(trace.selects()) <= 1, (year, month, trace.statements)
+        assert len(trace.statements) == len(trace.selects())
+    with sql_trace(conn) as trace:
+        load_month_data(repo, ledger, 2025, 12)
+    assert trace.statements == []
+
+@pytest.mark.profile(seed=5)
+def test_cold_month_load_is_one_select(conn, sql_trace):
+    ledger = PeriodLedger.build(conn)
+    repo = ShiftRepository(conn, ledger=ledger)
+    with sql_trace(conn) as trace:
+        shifts, weeks, totals = load_month_data(repo, ledger, 2024, 7)
+    assert len(trace.statements) == 1
+    assert repo.misses == len(months_between(*month_view.visible_range(2024, 7)))
+    assert list(weeks) == [week[0] for week in month_view.visible_weeks(2024, 7)]
+
+def _cached(conn, year, month):
+    repo = ShiftRepository(conn, ledger=PeriodLedger.build(conn))
+    repo.month(year, month)
+    assert (repo.hits, repo.misses) == (0, 1)
+    return repo
+
+def _assert_page_matches_db(conn, repo, year, month, hits, misses):
+    # страница отдаётся из кэша (или перечитывается после сброса) и совпадает с БД
+    page = repo.month(year, month)
+    assert (repo.hits, repo.misses) == (hits, misses)
+    assert page == database.load_shifts_between(conn, *month_bounds(year, month))
+
+def test_save_and_delete_update_cached_page(conn):
+    repo = _cached(conn, 2024, 3)
+    repo.save_shift("2024-03-04", "08:00", "19:00", 660, 0, 120, 4000, 1500, "")
+    _assert_page_matches_db(conn, repo, 2024, 3, 1, 1)
+    repo.delete_shift("2024-03-04")
+    _assert_page_matches_db(conn, repo, 2024, 3, 2, 1)
+    assert repo.load_shift("2024-03-04") is None
+
+def test_event_writes_invalidate_cached_page(conn):
+    repo = _cached(conn, 2024, 5)
+    repo.month(2024, 6)
+    repo.add_overtime_pay("2024-05-06", 2500)
+    assert (2024, 5) not in repo.pages and (2024, 6) in repo.pages
+    _assert_page_matches_db(conn, repo, 2024, 5, 0, 3)
+    summary = repo.distribute_pending_overtime(2024, 5)
+    assert summary["changed_days"]
+    assert (2024, 5) not in repo.pages
+    _assert_page_matches_db(conn, repo, 2024, 5, 0, 4)
+    assert repo.stats()["pages"] == 2
@@ -0,0 +1,37 @@
+from datetime import datetime
+from decimal import Decimal
+from salary_calendar import calculations
+from salary_calendar.repository import ShiftRepository
+from salary_calendar.session import ShiftSession, kept_from_row
+
+HOURLY = Decimal("515.97")
+LUNCH_MIN = 60
+
+def _session(started):
+    return ShiftSession(started, HOURLY, 480 + LUNCH_MIN, LUNCH_MIN, False)
+
+def _edit_day(repo, day_iso, activation, end, notes):
+    # то же, что сохранение дня в диалоге правки
+    duration_min = calculations.shift_duration_min(activation, end)
+    repo.save_shift(day_iso, activation, end, duration_min,
+                    *calculations.compute_shift(duration_min, HOURLY, 480 + LUNCH_MIN, LUNCH_MIN, False), notes)
+
+def test_end_after_day_edit_does_not_count_overtime_twice(conn):
+    repo = ShiftRepository(conn)
+    session = _session(datetime(2026, 3, 2, 8, 0))
+    repo.save_shift(*session.start_row(*kept_from_row(repo.load_shift(session.day_iso))))
+    _edit_day(repo, session.day_iso, "08:00", "19:30", "правка")
+    assert repo.load_shift(session.day_iso)[6] > 0
+    row = session.final_row(datetime(2026, 3, 2, 19, 30), *kept_from_row(repo.load_shift(session.day_iso)))
+    duration_min = calculations.shift_duration_min("08:00", "19:30")
+    expected = calculations.compute_shift(duration_min, HOURLY, 480 + LUNCH_MIN, LUNCH_MIN, False)
+    assert row[4:8] == expected
+    assert row[8] == "правка"
+
+def test_added_pay_of_open_row_is_kept(conn):
+    repo = ShiftRepository(conn)
+    session = _session(datetime(2026, 3, 3, 8, 0))
+    repo.save_shift(*session.start_row())
+    repo.add_overtime_pay(session.day_iso, 1234)
+    row = session.final_row(datetime(2026, 3, 3, 17, 0), *kept_from_row(repo.load_shift(session.day_iso)))
+    assert row[7] == 1234
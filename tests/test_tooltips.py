@@ -0,0 +1,62 @@
+import time
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+# Проход мышью по сетке: подсказка дня — одно окно на всё время работы, запросов к БД нет.
+# Нужен дисплей; без него тест пропускается.
+
+class _Event:
+    x_root = 100
+    y_root = 100
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        pytest.skip(f"нет дисплея: {e}")
+    root.withdraw()
+    yield root
+    try:
+        root.destroy()
+    except tk.TclError:
+        pass
+
+def _pump(root, condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "окно не дождалось данных"
+        root.update()
+        time.sleep(0.01)
+
+@pytest.fixture
+def app(root, tmp_path):
+    from salary_calendar.interface import CalendarApp
+    from salary_calendar.profile_manager import ProfileManager
+    manager = ProfileManager(str(tmp_path), catalog_file=str(tmp_path / "profiles.json"))
+    app = CalendarApp(root, "Test", manager)
+    _pump(root, lambda: app.ready and app._loading is None)
+    return app
+
+def test_hover_sweep_keeps_windows_and_queries_constant(root, app, monkeypatch):
+    created = []
+    original = tk.Toplevel.__init__
+    def counting_init(self, *args, **kwargs):
+        created.append(type(self).__name__)
+        original(self, *args, **kwargs)
+    monkeypatch.setattr(tk.Toplevel, "__init__", counting_init)
+    statements = []
+    app.conn.set_trace_callback(statements.append)
+    hint = app.create_tooltip(app.btn_settings, "Настройки Вида")
+    for _sweep in range(20):
+        for rc in app.day_buttons:
+            app._show_tooltip(_Event(), rc)
+            app._tooltip_due(rc, 100, 100)
+            app._hide_tooltip()
+        hint.show()
+        hint.hide()
+        root.update()
+    app.conn.set_trace_callback(None)
+    assert created == ["Tooltip", "Toplevel"]
+    assert statements == []